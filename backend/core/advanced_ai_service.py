@@ -12,18 +12,17 @@ import re
 import torch
 import numpy as np
 from typing import List, Dict, Any, Optional, Tuple, Union
-from collections import defaultdict, Counter
+from collections import defaultdict, Counter, deque
 from datetime import datetime
 import hashlib
 import base64
+import asyncio
+from types import MappingProxyType
 
 # Google Cloud imports
 from google.cloud import vision
 import google.generativeai as genai
 
-# AWS imports  
-import boto3
-
 # Advanced ML imports
 try:
     import open_clip
@@ -50,10 +49,119 @@ try:
 except ImportError:
     CV_AVAILABLE = False
 
+# Native MMCQ palette extraction
+try:
+    import fast_colorthief
+    FAST_COLORTHIEF_AVAILABLE = True
+except ImportError:
+    FAST_COLORTHIEF_AVAILABLE = False
+
 from core.credential_manager import credential_manager
 
 logger = logging.getLogger(__name__)
 
+# Common fashion category mappings, expanded into both (base, similar) orderings
+_CATEGORY_SYNONYMS = {
+    'shoe': ('footwear', 'sneaker', 'boot', 'sandal'),
+    'clothing': ('apparel', 'garment', 'outfit'),
+    'bag': ('handbag', 'purse', 'backpack'),
+    'accessory': ('jewelry', 'watch', 'belt'),
+}
+_CATEGORY_SYNONYM_PAIRS = frozenset(
+    pair
+    for base_term, similar_terms in _CATEGORY_SYNONYMS.items()
+    for similar in similar_terms
+    for pair in ((base_term, similar), (similar, base_term))
+)
+
+# Shared read-only default for lookups that only read the result; missing
+# sequences default to () for the same reason
+_EMPTY_MAPPING = MappingProxyType({})
+
+# Dominant colors are pixel fractions, which a thumbnail estimates as well as the full frame
+_COLOR_SAMPLE_SIZE = (256, 256)
+
+
+def _mean(values: List[float]) -> float:
+    """Arithmetic mean of a short score list; cheaper than np.mean at these sizes"""
+    return sum(values) / len(values)
+
+
+def _variance(values: List[float]) -> float:
+    """Population variance (np.var semantics) of a short score list"""
+    mean = _mean(values)
+    return sum((value - mean) ** 2 for value in values) / len(values)
+
+
+def _weighted_average(scores: Dict[str, float], weights: Dict[str, float], default_weight: float = 0.1) -> float:
+    """Weighted mean of named scores; names missing from the table get the default weight"""
+    weighted_sum = 0.0
+    total_weight = 0.0
+    for key, score in scores.items():
+        weight = weights.get(key, default_weight)
+        weighted_sum += score * weight
+        total_weight += weight
+    return weighted_sum / total_weight
+
+
+def _dominant_colors_from_columns(reds: np.ndarray, greens: np.ndarray, blues: np.ndarray,
+                                  fractions: np.ndarray) -> List[Dict[str, Any]]:
+    """Build dominant color dicts from aligned per-channel and pixel-fraction columns"""
+    return [
+        {'color': [r, g, b], 'score': fraction, 'pixel_fraction': fraction}
+        for r, g, b, fraction in zip(reds.tolist(), greens.tolist(), blues.tolist(), fractions.tolist())
+    ]
+
+
+def _extract_dominant_colors(image_data: bytes, top_k: int = 5) -> List[Dict[str, Any]]:
+    """Estimate dominant colors locally from a quantized RGB histogram"""
+    image = Image.open(io.BytesIO(image_data))
+    # JPEGs are scaled down inside libjpeg while decoding; thumbnail() covers other formats
+    image.draft('RGB', _COLOR_SAMPLE_SIZE)
+    image = image.convert('RGB')
+    image.thumbnail(_COLOR_SAMPLE_SIZE)
+    pixels = np.asarray(image, dtype=np.uint8).reshape(-1, 3)
+    
+    # Quantize to 5 bits per channel and pack into a 15-bit key (32768 bins)
+    quantized = (pixels >> 3).astype(np.uint16)
+    keys = (quantized[:, 0] << 10) | (quantized[:, 1] << 5) | quantized[:, 2]
+    counts = np.bincount(keys, minlength=1 << 15)
+    
+    top_k = min(top_k, int(np.count_nonzero(counts)))
+    if top_k == 0:
+        return []
+    
+    total_pixels = pixels.shape[0]
+    if FAST_COLORTHIEF_AVAILABLE:
+        try:
+            palette = np.asarray(fast_colorthief.get_palette(
+                np.asarray(image.convert('RGBA')), color_count=top_k, quality=10
+            ), dtype=np.int32)[:top_k]
+            
+            # Weight each palette color by the histogram bins nearest to it
+            populated = np.flatnonzero(counts)
+            bin_rgb = np.stack([((populated >> shift) & 0x1F) << 3 | 0x4 for shift in (10, 5, 0)], axis=1)
+            # |bin - color|^2 expanded; the |bin|^2 term is constant per row and cannot change the argmin,
+            # so this avoids materializing a (bins, colors, 3) difference array
+            distances = (palette.astype(np.int64) ** 2).sum(axis=1) - 2 * (bin_rgb @ palette.T)
+            weights = np.bincount(distances.argmin(axis=1), weights=counts[populated], minlength=len(palette))
+            
+            order = np.argsort(-weights)
+            ranked = palette[order]
+            return _dominant_colors_from_columns(
+                ranked[:, 0], ranked[:, 1], ranked[:, 2], weights[order] / total_pixels
+            )
+        except Exception as e:
+            logger.warning("fast_colorthief palette extraction failed: %s", e)
+    
+    top_keys = np.argpartition(counts, -top_k)[-top_k:]
+    top_keys = top_keys[np.argsort(-counts[top_keys])]
+    
+    # Unpack each channel column to the center of its quantization bin
+    reds, greens, blues = (((top_keys >> shift) & 0x1F) << 3 | 0x4 for shift in (10, 5, 0))
+    return _dominant_colors_from_columns(reds, greens, blues, counts[top_keys] / total_pixels)
+
+
 class AdvancedAIService:
 
     def search(self, query: str = None, **kwargs) -> dict:
@@ -65,6 +173,42 @@ class AdvancedAIService:
     and advanced machine learning techniques. No hardcoded lists or rules.
     """
     
+    # Sentence templates used to classify concepts into attribute types
+    _CLASSIFICATION_TEMPLATES = {
+        'product': (
+            "this is a type of clothing",
+            "this is a type of footwear",
+            "this is a type of accessory",
+            "this is a type of bag",
+            "this is a type of jewelry",
+        ),
+        'color': (
+            "this is a color",
+            "this describes a color",
+            "this is a shade",
+            "this is a hue",
+            "this describes appearance",
+        ),
+        'brand': (
+            "this is a brand name",
+            "this is a company name",
+            "this is a manufacturer",
+            "this is a designer label",
+        ),
+        'material': (
+            "this is a type of fabric",
+            "this is a material",
+            "this is made of this material",
+            "this describes texture",
+        ),
+        'style': (
+            "this describes a style",
+            "this is a fashion style",
+            "this describes how something looks",
+            "this is an aesthetic",
+        ),
+    }
+    
     def __init__(self):
         """Initialize advanced AI service with multiple neural networks"""
         logger.info("Initializing Advanced AI Service...")
@@ -72,11 +216,14 @@ class AdvancedAIService:
         # Core vision clients
         self._google_client = None
         self._aws_client = None
+        self._aws_client_initialized = False
         self._gemini_model = None
         
         # Advanced ML models
         self.clip_model = None
         self.clip_processor = None
+        self.clip_device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+        self.clip_dtype = torch.float16 if self.clip_device.type == 'cuda' else torch.float32
         self.sentence_transformer = None
         self.llm_pipeline = None
         self.feature_extractor = None
@@ -85,6 +232,10 @@ class AdvancedAIService:
         self.attention_weights = {}
         self.confidence_models = {}
         self.semantic_embeddings = {}
+        self._template_embeddings = None
+        self._clip_text_features = {}
+        self._semantic_categories = None
+        self._rekognition_results = {}
         self.visual_encoders = {}
         
         # Advanced AI components
@@ -110,6 +261,10 @@ class AdvancedAIService:
             self.clip_model, _, self.clip_processor = open_clip.create_model_and_transforms(
                 'ViT-L-14', pretrained='laion2b_s32b_b82k'  # Latest large model
             )
+            # Inference only: move to the accelerator and halve weight bytes on GPU
+            self.clip_model = self.clip_model.to(self.clip_device).eval()
+            if self.clip_device.type == 'cuda':
+                self.clip_model = self.clip_model.half()
             self.clip_tokenizer = open_clip.get_tokenizer('ViT-L-14')
             logger.info("CLIP ViT-L-14 model initialized")
             
@@ -123,7 +278,7 @@ class AdvancedAIService:
             logger.info("Feature extraction model initialized")
             
         except Exception as e:
-            logger.error(f"Failed to initialize neural networks: {e}")
+            logger.error("Failed to initialize neural networks: %s", e)
     
     def _initialize_advanced_components(self):
         """Initialize advanced AI reasoning components"""
@@ -143,7 +298,7 @@ class AdvancedAIService:
             logger.info("Advanced AI components initialized")
             
         except Exception as e:
-            logger.error(f"Failed to initialize advanced components: {e}")
+            logger.error("Failed to initialize advanced components: %s", e)
     
     @property
     def google_client(self):
@@ -167,16 +322,19 @@ class AdvancedAIService:
                     "quota_project_id": project_id
                 }
                 self._google_client = vision.ImageAnnotatorClient(client_options=client_options)
-                logger.info(f"Google Vision client initialized for project {project_id}")
+                logger.info("Google Vision client initialized for project %s", project_id)
             else:
                 logger.error("No Google API key available")
         except Exception as e:
-            logger.error(f"Failed to initialize Google Vision client: {e}")
+            logger.error("Failed to initialize Google Vision client: %s", e)
     
     @property
     def aws_client(self):
         """Lazy initialization of AWS Rekognition client"""
-        if self._aws_client is None:
+        # Attempt construction once; a disabled or unconfigured service stays None
+        # instead of re-reading credentials and rebuilding the client on every call
+        if not self._aws_client_initialized:
+            self._aws_client_initialized = True
             self._initialize_aws_client()
         return self._aws_client
     
@@ -189,6 +347,8 @@ class AdvancedAIService:
         try:
             aws_creds = credential_manager.get_aws_credentials()
             if aws_creds.get('aws_access_key_id'):
+                # boto3 is slow to import and only needed once Rekognition is actually used
+                import boto3
                 self._aws_client = boto3.client(
                     'rekognition',
                     aws_access_key_id=aws_creds['aws_access_key_id'],
@@ -199,7 +359,7 @@ class AdvancedAIService:
             else:
                 logger.error("No AWS credentials available")
         except Exception as e:
-            logger.error(f"Failed to initialize AWS Rekognition client: {e}")
+            logger.error("Failed to initialize AWS Rekognition client: %s", e)
     
     @property  
     def gemini_model(self):
@@ -219,7 +379,7 @@ class AdvancedAIService:
             else:
                 logger.error("No Google AI API key available")
         except Exception as e:
-            logger.error(f"Failed to initialize Gemini model: {e}")
+            logger.error("Failed to initialize Gemini model: %s", e)
     
     async def analyze_image_advanced(self, image_data: bytes, **kwargs) -> Dict[str, Any]:
         """
@@ -257,7 +417,7 @@ class AdvancedAIService:
                 'identified_attributes': final_results.get('attributes', {}),
                 'neural_reasoning': reasoning_results,
                 'search_queries': search_queries,
-                'visual_embeddings': final_results.get('embeddings', {}),
+                'visual_embeddings': self._serialize_embeddings(final_results.get('embeddings', {})),
                 'metadata': {
                     'models_used': final_results.get('models_used', []),
                     'processing_stages': 6,
@@ -266,43 +426,44 @@ class AdvancedAIService:
                 }
             }
             
-            logger.info(f"Advanced AI analysis completed with confidence: {final_results.get('overall_confidence', 0.0):.3f}")
+            logger.info("Advanced AI analysis completed with confidence: %.3f", final_results.get('overall_confidence', 0.0))
             return comprehensive_results
             
         except Exception as e:
-            logger.error(f"Advanced AI analysis failed: {e}")
+            logger.error("Advanced AI analysis failed: %s", e)
             return await self._fallback_analysis(image_data)
     
+    @staticmethod
+    def _serialize_embeddings(embeddings: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert embedding arrays to nested lists only at the response boundary"""
+        return {
+            key: value.tolist() if isinstance(value, np.ndarray) else value
+            for key, value in embeddings.items()
+        }
+    
     async def _multi_model_visual_analysis(self, image_data: bytes) -> Dict[str, Any]:
         """Run multiple vision models in parallel for comprehensive analysis"""
         results = {'models_used': []}
         
-        # Google Vision Analysis
+        # (result key, display name, analysis) for each configured model
+        analyses = []
         if self.google_client:
-            try:
-                google_results = await self._google_vision_analysis(image_data)
-                results['google_vision'] = google_results
-                results['models_used'].append('google_vision')
-            except Exception as e:
-                logger.error(f"Google Vision analysis failed: {e}")
-        
-        # AWS Rekognition Analysis
+            analyses.append(('google_vision', 'Google Vision', self._google_vision_analysis(image_data)))
         if self.aws_client:
-            try:
-                aws_results = await self._aws_rekognition_analysis(image_data)
-                results['aws_rekognition'] = aws_results
-                results['models_used'].append('aws_rekognition')
-            except Exception as e:
-                logger.error(f"AWS Rekognition analysis failed: {e}")
-        
-        # CLIP Visual Analysis
+            analyses.append(('aws_rekognition', 'AWS Rekognition', self._aws_rekognition_analysis(image_data)))
         if self.clip_model:
-            try:
-                clip_results = await self._clip_visual_analysis(image_data)
-                results['clip_analysis'] = clip_results
-                results['models_used'].append('clip_analysis')
-            except Exception as e:
-                logger.error(f"CLIP analysis failed: {e}")
+            analyses.append(('clip_analysis', 'CLIP', self._clip_visual_analysis(image_data)))
+        
+        # The cloud API calls run in worker threads, so their round-trips overlap with
+        # each other and with local CLIP inference; total latency is the slowest model
+        outcomes = await asyncio.gather(*(analysis for _, _, analysis in analyses), return_exceptions=True)
+        
+        for (key, name, _), outcome in zip(analyses, outcomes):
+            if isinstance(outcome, BaseException):
+                logger.error("%s analysis failed: %s", name, outcome)
+                continue
+            results[key] = outcome
+            results['models_used'].append(key)
         
         return results
     
@@ -322,7 +483,7 @@ class AdvancedAIService:
         ]
         
         request = vision.AnnotateImageRequest(image=image, features=features)
-        response = self.google_client.batch_annotate_images(requests=[request])
+        response = await asyncio.to_thread(self.google_client.batch_annotate_images, requests=[request])
         
         if not response.responses:
             return {}
@@ -348,10 +509,18 @@ class AdvancedAIService:
     
     async def _aws_rekognition_analysis(self, image_data: bytes) -> Dict[str, Any]:
         """Advanced AWS Rekognition analysis"""
+        # Each call uploads the full image twice (labels + text), so re-analysis of the
+        # same image (e.g. preview then finalize) reuses the earlier response instead
+        image_key = hashlib.blake2b(image_data, digest_size=16).digest()
+        cached = self._rekognition_results.get(image_key)
+        if cached is not None:
+            return dict(cached)
+        
         results = {}
         
         # Label detection
-        labels_response = self.aws_client.detect_labels(
+        labels_response = await asyncio.to_thread(
+            self.aws_client.detect_labels,
             Image={'Bytes': image_data},
             MaxLabels=20,
             MinConfidence=50
@@ -364,64 +533,100 @@ class AdvancedAIService:
         
         # Text detection
         try:
-            text_response = self.aws_client.detect_text(Image={'Bytes': image_data})
+            text_response = await asyncio.to_thread(self.aws_client.detect_text, Image={'Bytes': image_data})
             results['text_detections'] = [
                 {'text': detection['DetectedText'], 'confidence': detection['Confidence']}
                 for detection in text_response['TextDetections']
             ]
         except Exception as e:
-            logger.warning(f"AWS text detection failed: {e}")
+            logger.warning("AWS text detection failed: %s", e)
             results['text_detections'] = []
+            return results
         
         # Celebrity/face detection removed: not relevant for item/apparel recognition
         # If needed in the future, can be re-added for specific use cases
         
-        return results
+        # Only complete responses are cached, so a transient text failure is retried
+        if len(self._rekognition_results) >= 128:
+            self._rekognition_results.clear()
+        self._rekognition_results[image_key] = results
+        return dict(results)
     
     async def _clip_visual_analysis(self, image_data: bytes) -> Dict[str, Any]:
         """Advanced CLIP-based visual analysis"""
-        if not self.clip_model:
-            return {}
+        results = await self._clip_visual_analysis_batch([image_data])
+        return results[0] if results else {}
+    
+    async def _clip_visual_analysis_batch(self, images: List[bytes]) -> List[Dict[str, Any]]:
+        """CLIP-based visual analysis for several images with a single forward pass"""
+        if not self.clip_model or not images:
+            return []
             
         try:
-            # Load and preprocess image
-            image = Image.open(io.BytesIO(image_data)).convert('RGB')
-            image_tensor = self.clip_processor(image).unsqueeze(0)
-            
-            # Generate image embeddings
-            with torch.no_grad():
-                image_features = self.clip_model.encode_image(image_tensor)
-                image_features = image_features / image_features.norm(dim=-1, keepdim=True)
+            image_features = self._clip_encode_images(images)
             
             # Generate semantic categories through zero-shot classification
             semantic_categories = await self._generate_semantic_categories()
-            category_scores = []
-            
-            for category in semantic_categories:
-                text_tokens = self.clip_tokenizer([f"a photo of {category}"])
-                with torch.no_grad():
-                    text_features = self.clip_model.encode_text(text_tokens)
-                    text_features = text_features / text_features.norm(dim=-1, keepdim=True)
-                    
-                    similarity = torch.cosine_similarity(image_features, text_features)
-                    category_scores.append({
-                        'category': category,
-                        'similarity': similarity.item(),
-                        'confidence': torch.sigmoid(similarity * 10).item()  # Scale to 0-1
-                    })
+            text_features = self._get_clip_text_features(tuple(semantic_categories))
+            
+            # Both sides are L2-normalized, so one matmul gives every cosine similarity
+            with torch.inference_mode():
+                similarities = (image_features @ text_features.T).float()
+                confidences = torch.sigmoid(similarities * 10)  # Scale to 0-1
+            
+            embeddings = image_features.float().cpu().numpy()
+            similarities = similarities.cpu().numpy()
+            confidences = confidences.cpu().numpy()
+            
+            # Rank every image's categories by confidence in one stable sort; keep the top 10
+            top_categories = np.argsort(-confidences, axis=1, kind='stable')[:, :10]
+            
+            results = []
+            for row, category_order in enumerate(top_categories):
+                category_scores = [
+                    {
+                        'category': semantic_categories[i],
+                        'similarity': float(similarities[row, i]),
+                        'confidence': float(confidences[row, i])
+                    }
+                    for i in category_order
+                ]
+                
+                results.append({
+                    'image_embeddings': embeddings[row:row + 1],
+                    'semantic_categories': category_scores,
+                    'embedding_dimension': image_features.shape[-1]
+                })
             
-            # Sort by confidence
-            category_scores.sort(key=lambda x: x['confidence'], reverse=True)
-            
-            return {
-                'image_embeddings': image_features.numpy().tolist(),
-                'semantic_categories': category_scores[:10],  # Top 10
-                'embedding_dimension': image_features.shape[-1]
-            }
+            return results
             
         except Exception as e:
-            logger.error(f"CLIP analysis failed: {e}")
-            return {}
+            logger.error("CLIP analysis failed: %s", e)
+            return []
+    
+    def _clip_encode_images(self, images: List[bytes]) -> "torch.Tensor":
+        """Preprocess and encode a batch of images into L2-normalized CLIP features"""
+        tensors = []
+        for image_data in images:
+            with Image.open(io.BytesIO(image_data)) as image:
+                tensors.append(self.clip_processor(image.convert('RGB')))
+        
+        batch = torch.stack(tensors).to(self.clip_device, dtype=self.clip_dtype, non_blocking=True)
+        with torch.inference_mode():
+            image_features = self.clip_model.encode_image(batch)
+            return image_features / image_features.norm(dim=-1, keepdim=True)
+    
+    def _get_clip_text_features(self, categories: Tuple[str, ...]) -> "torch.Tensor":
+        """Encode zero-shot category prompts once and reuse the normalized features"""
+        text_features = self._clip_text_features.get(categories)
+        if text_features is None:
+            text_tokens = self.clip_tokenizer([f"a photo of {category}" for category in categories])
+            text_tokens = text_tokens.to(self.clip_device)
+            with torch.inference_mode():
+                text_features = self.clip_model.encode_text(text_tokens)
+                text_features = text_features / text_features.norm(dim=-1, keepdim=True)
+            self._clip_text_features[categories] = text_features
+        return text_features
     
     async def _generate_semantic_categories(self) -> List[str]:
         """Generate semantic categories using neural networks - no hardcoded lists"""
@@ -432,15 +637,16 @@ class AdvancedAIService:
                 "watch", "sunglasses", "hat", "belt", "scarf"
             ]
         
+        # The category set only depends on the seed concepts, so build it once per service
+        if self._semantic_categories is not None:
+            return list(self._semantic_categories)
+        
         # Use neural network to generate categories based on fashion/apparel domain
         fashion_seed_concepts = [
             "fashion item", "clothing", "apparel", "wearable item",
             "style accessory", "fashion accessory", "wardrobe piece"
         ]
         
-        # Generate embeddings for seed concepts
-        seed_embeddings = self.sentence_transformer.encode(fashion_seed_concepts)
-        
         # Use clustering or nearest neighbor to find related concepts
         # This would typically involve a pre-trained concept database
         # For now, return dynamically generated categories
@@ -456,7 +662,8 @@ class AdvancedAIService:
             ]
             categories.extend(variations)
         
-        return categories[:50]  # Limit to top 50 categories
+        self._semantic_categories = tuple(categories[:50])  # Limit to top 50 categories
+        return list(self._semantic_categories)
     
     async def _semantic_understanding(self, image_data: bytes, visual_results: Dict[str, Any]) -> Dict[str, Any]:
         """Extract semantic understanding using NLP models"""
@@ -470,20 +677,23 @@ class AdvancedAIService:
             # From Google Vision
             if 'google_vision' in visual_results:
                 gv = visual_results['google_vision']
-                all_text.extend([label['description'] for label in gv.get('labels', [])])
-                all_text.extend([obj['name'] for obj in gv.get('objects', [])])
-                all_text.extend([entity['description'] for entity in gv.get('web_entities', [])])
-                all_text.extend(gv.get('text_annotations', []))
+                all_text.extend([label['description'] for label in gv.get('labels', ())])
+                all_text.extend([obj['name'] for obj in gv.get('objects', ())])
+                all_text.extend([entity['description'] for entity in gv.get('web_entities', ())])
+                all_text.extend(gv.get('text_annotations', ()))
             
             # From AWS Rekognition
             if 'aws_rekognition' in visual_results:
                 aws = visual_results['aws_rekognition']
-                all_text.extend([label['name'] for label in aws.get('labels', [])])
-                all_text.extend([text['text'] for text in aws.get('text_detections', [])])
+                all_text.extend([label['name'] for label in aws.get('labels', ())])
+                all_text.extend([text['text'] for text in aws.get('text_detections', ())])
             
-            # Generate semantic embeddings
+            # Generate semantic embeddings: labels repeat across models, so each distinct
+            # text is encoded once in a single batch (skipping cached ones) and the rows
+            # are gathered back into all_text order. This also seeds the concept cache
+            # that attribute classification reads from.
             if all_text:
-                text_embeddings = self.sentence_transformer.encode(all_text)
+                text_embeddings = self._encode_concepts(all_text)
                 
                 # Cluster similar concepts
                 clustered_concepts = await self._cluster_semantic_concepts(all_text, text_embeddings)
@@ -492,7 +702,7 @@ class AdvancedAIService:
                 attributes = await self._extract_semantic_attributes(clustered_concepts)
                 
                 return {
-                    'semantic_embeddings': text_embeddings.tolist(),
+                    'semantic_embeddings': text_embeddings,
                     'clustered_concepts': clustered_concepts,
                     'extracted_attributes': attributes,
                     'confidence': self._calculate_semantic_confidence(clustered_concepts)
@@ -501,7 +711,7 @@ class AdvancedAIService:
             return {}
             
         except Exception as e:
-            logger.error(f"Semantic understanding failed: {e}")
+            logger.error("Semantic understanding failed: %s", e)
             return {}
     
     async def _cluster_semantic_concepts(self, texts: List[str], embeddings: np.ndarray) -> Dict[str, List[str]]:
@@ -524,7 +734,7 @@ class AdvancedAIService:
             return dict(clusters)
             
         except Exception as e:
-            logger.error(f"Concept clustering failed: {e}")
+            logger.error("Concept clustering failed: %s", e)
             # Fallback: group by similarity
             return {"all_concepts": texts}
     
@@ -539,160 +749,105 @@ class AdvancedAIService:
             'confidence_scores': {}
         }
         
+        if not self.sentence_transformer:
+            return attributes
+        
         try:
-            # Use neural networks to classify concepts into attribute categories
-            for cluster_name, concepts in clustered_concepts.items():
-                if not concepts:
-                    continue
-                
-                # Classify each concept
-                for concept in concepts:
-                    concept_lower = concept.lower()
-                    
-                    # Use semantic similarity to determine attribute type
-                    if self.sentence_transformer:
-                        # Product type classification
-                        product_templates = [
-                            "this is a type of clothing",
-                            "this is a type of footwear", 
-                            "this is a type of accessory",
-                            "this is a type of bag",
-                            "this is a type of jewelry"
-                        ]
-                        
-                        concept_embedding = self.sentence_transformer.encode([concept])
-                        template_embeddings = self.sentence_transformer.encode(product_templates)
-                        
-                        similarities = np.dot(concept_embedding, template_embeddings.T).flatten()
-                        best_match_idx = np.argmax(similarities)
-                        
-                        if similarities[best_match_idx] > 0.5:  # High similarity threshold
-                            if not attributes['product_type'] or similarities[best_match_idx] > attributes['confidence_scores'].get('product_type', 0):
-                                attributes['product_type'] = concept
-                                attributes['confidence_scores']['product_type'] = similarities[best_match_idx]
-                    
-                    # Color detection using neural classification
-                    if await self._is_color_indicator(concept):
-                        attributes['color_indicators'].append(concept)
-                    
-                    # Brand detection using neural patterns
-                    if await self._is_brand_indicator(concept):
-                        attributes['brand_indicators'].append(concept)
-                    
-                    # Material detection
-                    if await self._is_material_indicator(concept):
-                        attributes['material_indicators'].append(concept)
-                    
-                    # Style detection
-                    if await self._is_style_indicator(concept):
-                        attributes['style_indicators'].append(concept)
+            # Concepts repeated across clusters are classified once, which also
+            # keeps every indicator list duplicate-free in first-seen order
+            concepts = list(dict.fromkeys(
+                concept for cluster_concepts in clustered_concepts.values() for concept in cluster_concepts
+            ))
+            if not concepts:
+                return attributes
+            
+            # Score every concept against every template kind with one matmul per kind
+            concept_embeddings = self._encode_concepts(concepts)
+            best_similarity = {
+                kind: np.dot(concept_embeddings, self._get_template_embeddings(kind).T).max(axis=1)
+                for kind in self._CLASSIFICATION_TEMPLATES
+            }
             
-            # Remove duplicates and sort by confidence
-            for key in ['brand_indicators', 'color_indicators', 'material_indicators', 'style_indicators']:
-                attributes[key] = list(set(attributes[key]))
+            # Product type: the first concept with the highest similarity above threshold
+            product_similarities = best_similarity['product']
+            best_product_idx = int(np.argmax(product_similarities))
+            if product_similarities[best_product_idx] > 0.5:  # High similarity threshold
+                attributes['product_type'] = concepts[best_product_idx]
+                attributes['confidence_scores']['product_type'] = product_similarities[best_product_idx]
+            
+            color_mask = best_similarity['color'] > 0.6
+            material_mask = best_similarity['material'] > 0.6
+            style_mask = best_similarity['style'] > 0.6
+            brand_semantic_mask = best_similarity['brand'] > 0.5
+            
+            for i, concept in enumerate(concepts):
+                # Color detection using neural classification
+                if color_mask[i]:
+                    attributes['color_indicators'].append(concept)
+                
+                # Brand-like if the semantic match and surface patterns together give two votes
+                if self._brand_pattern_votes(concept) + brand_semantic_mask[i] >= 2:
+                    attributes['brand_indicators'].append(concept)
+                
+                # Material detection
+                if material_mask[i]:
+                    attributes['material_indicators'].append(concept)
+                
+                # Style detection
+                if style_mask[i]:
+                    attributes['style_indicators'].append(concept)
             
             return attributes
             
         except Exception as e:
-            logger.error(f"Attribute extraction failed: {e}")
+            logger.error("Attribute extraction failed: %s", e)
             return attributes
     
-    async def _is_color_indicator(self, concept: str) -> bool:
-        """Neural network-based color detection"""
-        if not self.sentence_transformer:
-            return False
-            
-        try:
-            # Use semantic similarity to known color concepts
-            color_templates = [
-                "this is a color", "this describes a color", "this is a shade",
-                "this is a hue", "this describes appearance"
-            ]
-            
-            concept_embedding = self.sentence_transformer.encode([concept])
-            template_embeddings = self.sentence_transformer.encode(color_templates)
-            
-            similarities = np.dot(concept_embedding, template_embeddings.T).flatten()
-            return np.max(similarities) > 0.6
-            
-        except Exception as e:
-            return False
+    def _encode_concepts(self, concepts: List[str]) -> np.ndarray:
+        """Stack concept embeddings, encoding any cache misses in a single batch"""
+        embeddings = {concept: self.semantic_embeddings.get(concept) for concept in concepts}
+        missing = [concept for concept, embedding in embeddings.items() if embedding is None]
+        if missing:
+            encoded = self.sentence_transformer.encode(missing)
+            for i, concept in enumerate(missing):
+                embeddings[concept] = self._cache_concept_embedding(concept, encoded[i:i + 1])
+        return np.vstack([embeddings[concept] for concept in concepts])
     
-    async def _is_brand_indicator(self, concept: str) -> bool:
-        """Neural network-based brand detection"""
-        if not self.sentence_transformer:
-            return False
-            
-        try:
-            # Check if concept has brand-like characteristics
-            brand_patterns = [
-                # Capitalization pattern
-                concept[0].isupper() if concept else False,
-                # Length pattern (brands are usually 3-15 characters)
-                3 <= len(concept) <= 15 if concept else False,
-                # Alphabetic pattern (brands are mostly alphabetic)
-                concept.isalpha() if concept else False,
-                # Semantic similarity to brand concepts
-                False  # Will be filled below
-            ]
-            
-            # Semantic similarity check
-            brand_templates = [
-                "this is a brand name", "this is a company name", 
-                "this is a manufacturer", "this is a designer label"
-            ]
-            
-            concept_embedding = self.sentence_transformer.encode([concept])
-            template_embeddings = self.sentence_transformer.encode(brand_templates)
-            
-            similarities = np.dot(concept_embedding, template_embeddings.T).flatten()
-            brand_patterns[3] = np.max(similarities) > 0.5
-            
-            # Brand-like if multiple patterns match
-            return sum(brand_patterns) >= 2
-            
-        except Exception as e:
-            return False
+    def _cache_concept_embedding(self, concept: str, embedding: np.ndarray) -> np.ndarray:
+        """Store a concept embedding, resetting the cache once it grows too large"""
+        if len(self.semantic_embeddings) >= 4096:
+            self.semantic_embeddings.clear()
+        self.semantic_embeddings[concept] = embedding
+        return embedding
     
-    async def _is_material_indicator(self, concept: str) -> bool:
-        """Neural network-based material detection"""
-        if not self.sentence_transformer:
-            return False
-            
-        try:
-            material_templates = [
-                "this is a type of fabric", "this is a material",
-                "this is made of this material", "this describes texture"
-            ]
-            
-            concept_embedding = self.sentence_transformer.encode([concept])
-            template_embeddings = self.sentence_transformer.encode(material_templates)
-            
-            similarities = np.dot(concept_embedding, template_embeddings.T).flatten()
-            return np.max(similarities) > 0.6
-            
-        except Exception as e:
-            return False
+    def _get_template_embeddings(self, kind: str) -> np.ndarray:
+        """Encode every classification template once and reuse the embeddings"""
+        if self._template_embeddings is None:
+            kinds = list(self._CLASSIFICATION_TEMPLATES)
+            encoded = self.sentence_transformer.encode(
+                [template for k in kinds for template in self._CLASSIFICATION_TEMPLATES[k]]
+            )
+            self._template_embeddings = {}
+            offset = 0
+            for k in kinds:
+                count = len(self._CLASSIFICATION_TEMPLATES[k])
+                self._template_embeddings[k] = encoded[offset:offset + count]
+                offset += count
+        return self._template_embeddings[kind]
     
-    async def _is_style_indicator(self, concept: str) -> bool:
-        """Neural network-based style detection"""
-        if not self.sentence_transformer:
-            return False
-            
-        try:
-            style_templates = [
-                "this describes a style", "this is a fashion style",
-                "this describes how something looks", "this is an aesthetic"
-            ]
-            
-            concept_embedding = self.sentence_transformer.encode([concept])
-            template_embeddings = self.sentence_transformer.encode(style_templates)
-            
-            similarities = np.dot(concept_embedding, template_embeddings.T).flatten()
-            return np.max(similarities) > 0.6
-            
-        except Exception as e:
-            return False
+    @staticmethod
+    def _brand_pattern_votes(concept: str) -> int:
+        """Count the surface patterns that make a concept look like a brand name"""
+        if not concept:
+            return 0
+        return (
+            # Capitalization pattern
+            concept[0].isupper()
+            # Length pattern (brands are usually 3-15 characters)
+            + (3 <= len(concept) <= 15)
+            # Alphabetic pattern (brands are mostly alphabetic)
+            + concept.isalpha()
+        )
     
     async def _neural_reasoning(self, visual_results: Dict[str, Any], semantic_results: Dict[str, Any]) -> Dict[str, Any]:
         """Apply neural reasoning to synthesize information"""
@@ -702,7 +857,7 @@ class AdvancedAIService:
         try:
             return await self.neural_reasoner.reason(visual_results, semantic_results)
         except Exception as e:
-            logger.error(f"Neural reasoning failed: {e}")
+            logger.error("Neural reasoning failed: %s", e)
             return {}
     
     async def _multimodal_fusion_analysis(self, visual_results: Dict[str, Any], 
@@ -715,7 +870,7 @@ class AdvancedAIService:
         try:
             return await self.multimodal_fusion.fuse(visual_results, semantic_results, reasoning_results)
         except Exception as e:
-            logger.error(f"Multimodal fusion failed: {e}")
+            logger.error("Multimodal fusion failed: %s", e)
             return self._simple_fusion(visual_results, semantic_results, reasoning_results)
     
     def _simple_fusion(self, visual_results: Dict[str, Any], 
@@ -746,9 +901,9 @@ class AdvancedAIService:
         """Quantify uncertainty in the analysis"""
         if not self.uncertainty_quantifier:
             # Simple uncertainty estimation
-            confidence_scores = fused_results.get('confidence_scores', {})
+            confidence_scores = fused_results.get('confidence_scores', _EMPTY_MAPPING)
             if confidence_scores:
-                overall_confidence = np.mean(list(confidence_scores.values()))
+                overall_confidence = _mean(list(confidence_scores.values()))
                 uncertainty_score = 1.0 - overall_confidence
             else:
                 overall_confidence = 0.5
@@ -761,15 +916,14 @@ class AdvancedAIService:
         try:
             return await self.uncertainty_quantifier.quantify(fused_results)
         except Exception as e:
-            logger.error(f"Uncertainty quantification failed: {e}")
+            logger.error("Uncertainty quantification failed: %s", e)
             fused_results['overall_confidence'] = 0.5
             fused_results['uncertainty_score'] = 0.5
             return fused_results
     
     async def _generate_adaptive_search_queries(self, final_results: Dict[str, Any]) -> List[str]:
         """Generate adaptive search queries based on AI analysis"""
-        queries = []
-        attributes = final_results.get('attributes', {})
+        attributes = final_results.get('attributes', _EMPTY_MAPPING)
         
         try:
             # Extract key components
@@ -788,54 +942,46 @@ class AdvancedAIService:
             if product_type:
                 base_components.append(product_type)
             
-            # Primary query with main components
-            if base_components:
-                queries.append(' '.join(base_components))
-            
-            # Add color variants
-            for color in color_indicators[:2]:  # Top 2 colors
-                if base_components:
-                    color_query = base_components + [color]
-                    queries.append(' '.join(color_query))
-            
-            # Add style variants  
-            for style in style_indicators[:2]:  # Top 2 styles
-                if base_components:
-                    style_query = base_components + [style]
-                    queries.append(' '.join(style_query))
-            
-            # Add material variants
-            for material in material_indicators[:1]:  # Top 1 material
-                if base_components:
-                    material_query = base_components + [material]
-                    queries.append(' '.join(material_query))
-            
-            # Comprehensive query
-            all_components = base_components + color_indicators[:1] + style_indicators[:1]
-            if len(all_components) > 2:
-                queries.append(' '.join(all_components))
-            
-            # Fallback queries
-            if not queries:
-                if product_type:
-                    queries.append(product_type)
-                elif brand_indicators:
-                    queries.append(brand_indicators[0])
-                else:
-                    queries.append("fashion item")
+            # Queries are produced lazily so generation stops at the limit below
+            def candidate_queries():
+                if not base_components:
+                    return
+                
+                # Primary query with main components
+                yield ' '.join(base_components)
+                
+                # Add color (top 2), style (top 2) and material (top 1) variants
+                for variant in (*color_indicators[:2], *style_indicators[:2], *material_indicators[:1]):
+                    yield ' '.join(base_components + [variant])
+                
+                # Comprehensive query
+                all_components = base_components + color_indicators[:1] + style_indicators[:1]
+                if len(all_components) > 2:
+                    yield ' '.join(all_components)
             
-            # Remove duplicates while preserving order
+            # Remove duplicates while preserving order, limited to 8 queries
             seen = set()
             unique_queries = []
-            for query in queries:
+            for query in candidate_queries():
                 if query not in seen:
                     seen.add(query)
                     unique_queries.append(query)
+                    if len(unique_queries) >= 8:
+                        break
+            
+            # Fallback queries
+            if not unique_queries:
+                if product_type:
+                    unique_queries.append(product_type)
+                elif brand_indicators:
+                    unique_queries.append(brand_indicators[0])
+                else:
+                    unique_queries.append("fashion item")
             
-            return unique_queries[:8]  # Limit to 8 queries
+            return unique_queries
             
         except Exception as e:
-            logger.error(f"Query generation failed: {e}")
+            logger.error("Query generation failed: %s", e)
             return ["fashion item", "clothing", "apparel"]
     
     def _calculate_semantic_confidence(self, clustered_concepts: Dict[str, List[str]]) -> float:
@@ -844,7 +990,7 @@ class AdvancedAIService:
             return 0.0
         
         total_concepts = sum(len(concepts) for concepts in clustered_concepts.values())
-        noise_concepts = len(clustered_concepts.get('noise', []))
+        noise_concepts = len(clustered_concepts.get('noise', ()))
         
         if total_concepts == 0:
             return 0.0
@@ -869,6 +1015,19 @@ class AdvancedAIService:
     
     async def _fallback_analysis(self, image_data: bytes) -> Dict[str, Any]:
         """Fallback analysis when advanced methods fail"""
+        # Local color extraction still works when every remote model is unavailable
+        dominant_colors = []
+        color_indicators = []
+        try:
+            dominant_colors = await asyncio.to_thread(_extract_dominant_colors, image_data)
+            if self.multimodal_fusion:
+                for color_info in dominant_colors:
+                    color_name = self.multimodal_fusion._rgb_to_color_name(color_info['color'])
+                    if color_name and color_name not in color_indicators:
+                        color_indicators.append(color_name)
+        except Exception as e:
+            logger.warning("Fallback color extraction failed: %s", e)
+        
         return {
             'analysis_timestamp': datetime.utcnow().isoformat(),
             'ai_confidence': 0.3,
@@ -876,10 +1035,11 @@ class AdvancedAIService:
             'identified_attributes': {
                 'product_type': 'item',
                 'brand_indicators': [],
-                'color_indicators': [],
+                'color_indicators': color_indicators,
                 'material_indicators': [],
                 'style_indicators': []
             },
+            'dominant_colors': dominant_colors,
             'search_queries': ['item', 'clothing', 'fashion'],
             'metadata': {
                 'models_used': [],
@@ -893,6 +1053,9 @@ class AdvancedAIService:
 class NeuralReasoner:
     """Neural reasoning component for synthesizing multi-modal information"""
     
+    # Weight Google Vision higher (it's usually more accurate)
+    _MODEL_CONFIDENCE_WEIGHTS = {'google_confidence': 0.5, 'aws_confidence': 0.3, 'clip_confidence': 0.2}
+    
     async def reason(self, visual_results: Dict[str, Any], semantic_results: Dict[str, Any]) -> Dict[str, Any]:
         """Apply neural reasoning to synthesize information from multiple sources"""
         reasoning = {
@@ -915,7 +1078,7 @@ class NeuralReasoner:
             return reasoning
             
         except Exception as e:
-            logger.error(f"Neural reasoning failed: {e}")
+            logger.error("Neural reasoning failed: %s", e)
             return reasoning
     
     def _fuse_confidence_scores(self, visual_results: Dict[str, Any]) -> Dict[str, float]:
@@ -930,11 +1093,11 @@ class NeuralReasoner:
             model_scores['google'] = []
             
             # Label confidences
-            for label in gv.get('labels', []):
+            for label in gv.get('labels', ()):
                 model_scores['google'].append(label.get('confidence', 0.0))
             
             # Object confidences
-            for obj in gv.get('objects', []):
+            for obj in gv.get('objects', ()):
                 model_scores['google'].append(obj.get('confidence', 0.0))
         
         if 'aws_rekognition' in visual_results:
@@ -942,7 +1105,7 @@ class NeuralReasoner:
             model_scores['aws'] = []
             
             # Label confidences (convert from 0-100 to 0-1)
-            for label in aws.get('labels', []):
+            for label in aws.get('labels', ()):
                 model_scores['aws'].append(label.get('confidence', 0.0) / 100.0)
         
         if 'clip_analysis' in visual_results:
@@ -950,33 +1113,19 @@ class NeuralReasoner:
             model_scores['clip'] = []
             
             # Semantic category confidences
-            for category in clip.get('semantic_categories', []):
+            for category in clip.get('semantic_categories', ()):
                 model_scores['clip'].append(category.get('confidence', 0.0))
         
         # Calculate fused confidence for each model
         for model_name, scores in model_scores.items():
             if scores:
-                fused_scores[f"{model_name}_confidence"] = np.mean(scores)
+                fused_scores[f"{model_name}_confidence"] = _mean(scores)
             else:
                 fused_scores[f"{model_name}_confidence"] = 0.0
         
         # Overall fused confidence using weighted average
         if fused_scores:
-            # Weight Google Vision higher (it's usually more accurate)
-            weights = {'google_confidence': 0.5, 'aws_confidence': 0.3, 'clip_confidence': 0.2}
-            
-            weighted_sum = 0.0
-            total_weight = 0.0
-            
-            for key, confidence in fused_scores.items():
-                weight = weights.get(key, 0.1)
-                weighted_sum += confidence * weight
-                total_weight += weight
-            
-            if total_weight > 0:
-                fused_scores['overall_confidence'] = weighted_sum / total_weight
-            else:
-                fused_scores['overall_confidence'] = np.mean(list(fused_scores.values()))
+            fused_scores['overall_confidence'] = _weighted_average(fused_scores, self._MODEL_CONFIDENCE_WEIGHTS)
         
         return fused_scores
     
@@ -988,56 +1137,39 @@ class NeuralReasoner:
             'confidence_scores': {}
         }
         
-        # Collect attributes from all sources
-        attribute_sources = {}
+        # Count attribute frequency across sources in a single pass
+        attribute_counts = Counter()
+        source_count = 0
         
         # From Google Vision
         if 'google_vision' in visual_results:
             gv = visual_results['google_vision']
-            attribute_sources['google'] = {
-                'labels': [label['description'] for label in gv.get('labels', [])],
-                'objects': [obj['name'] for obj in gv.get('objects', [])],
-                'web_entities': [entity['description'] for entity in gv.get('web_entities', [])]
-            }
+            source_count += 1
+            attribute_counts.update(label['description'] for label in gv.get('labels', ()))
+            attribute_counts.update(obj['name'] for obj in gv.get('objects', ()))
+            attribute_counts.update(entity['description'] for entity in gv.get('web_entities', ()))
         
         # From AWS Rekognition
         if 'aws_rekognition' in visual_results:
             aws = visual_results['aws_rekognition']
-            attribute_sources['aws'] = {
-                'labels': [label['name'] for label in aws.get('labels', [])]
-            }
+            source_count += 1
+            attribute_counts.update(label['name'] for label in aws.get('labels', ()))
         
         # From semantic analysis
         if 'extracted_attributes' in semantic_results:
             semantic_attrs = semantic_results['extracted_attributes']
-            attribute_sources['semantic'] = {
-                'product_type': semantic_attrs.get('product_type'),
-                'brands': semantic_attrs.get('brand_indicators', []),
-                'colors': semantic_attrs.get('color_indicators', []),
-                'materials': semantic_attrs.get('material_indicators', []),
-                'styles': semantic_attrs.get('style_indicators', [])
-            }
-        
-        # Find overlapping attributes (consensus)
-        all_attributes = []
-        for source, attrs in attribute_sources.items():
-            if isinstance(attrs, dict):
-                for attr_type, attr_values in attrs.items():
-                    if isinstance(attr_values, list):
-                        all_attributes.extend(attr_values)
-                    elif attr_values:
-                        all_attributes.append(attr_values)
-            elif isinstance(attrs, list):
-                all_attributes.extend(attrs)
-        
-        # Count attribute frequency across sources
-        attribute_counts = Counter(all_attributes)
+            source_count += 1
+            product_type = semantic_attrs.get('product_type')
+            if product_type:
+                attribute_counts[product_type] += 1
+            for key in ('brand_indicators', 'color_indicators', 'material_indicators', 'style_indicators'):
+                attribute_counts.update(semantic_attrs.get(key) or [])
         
         # Attributes agreed upon by multiple sources
         for attr, count in attribute_counts.items():
             if count > 1:  # Appeared in multiple sources
                 consensus['agreed_attributes'][attr] = count
-                consensus['confidence_scores'][attr] = min(1.0, count / len(attribute_sources))
+                consensus['confidence_scores'][attr] = min(1.0, count / source_count)
         
         return consensus
     
@@ -1054,21 +1186,25 @@ class NeuralReasoner:
         aws_objects = []
         
         if 'google_vision' in visual_results:
-            google_objects = [obj['name'].lower() for obj in visual_results['google_vision'].get('objects', [])]
+            google_objects = [obj['name'].lower() for obj in visual_results['google_vision'].get('objects', ())]
         
         if 'aws_rekognition' in visual_results:
-            aws_objects = [label['name'].lower() for label in visual_results['aws_rekognition'].get('labels', [])]
+            aws_objects = [label['name'].lower() for label in visual_results['aws_rekognition'].get('labels', ())]
         
         # Find conflicts in object/category detection
         if google_objects and aws_objects:
+            # Labels both models agree on verbatim need no pairwise similarity scan
+            aws_object_set = frozenset(aws_objects)
+            
             # Check for semantic conflicts
             for g_obj in google_objects:
-                conflicting = True
-                for a_obj in aws_objects:
-                    # Check if they're semantically similar
-                    if self._are_semantically_similar(g_obj, a_obj):
-                        conflicting = False
-                        break
+                conflicting = g_obj not in aws_object_set
+                if conflicting:
+                    for a_obj in aws_object_set:
+                        # Check if they're semantically similar
+                        if self._are_semantically_similar(g_obj, a_obj):
+                            conflicting = False
+                            break
                 
                 if conflicting:
                     conflicts['detected_conflicts'].append({
@@ -1095,24 +1231,19 @@ class NeuralReasoner:
             return True
         
         # Common fashion category mappings
-        similarity_mappings = {
-            'shoe': ['footwear', 'sneaker', 'boot', 'sandal'],
-            'clothing': ['apparel', 'garment', 'outfit'],
-            'bag': ['handbag', 'purse', 'backpack'],
-            'accessory': ['jewelry', 'watch', 'belt']
-        }
-        
-        for base_term, similar_terms in similarity_mappings.items():
-            if (term1_lower == base_term and term2_lower in similar_terms) or \
-               (term2_lower == base_term and term1_lower in similar_terms):
-                return True
-        
-        return False
+        return (term1_lower, term2_lower) in _CATEGORY_SYNONYM_PAIRS
 
 
 class MultimodalFusion:
     """Multimodal fusion component for combining different types of AI analysis"""
     
+    _MODEL_CONFIDENCE_WEIGHTS = {
+        'google_confidence': 0.4,
+        'aws_confidence': 0.2,
+        'clip_confidence': 0.2,
+        'semantic_confidence': 0.2
+    }
+    
     async def fuse(self, visual_results: Dict[str, Any], 
                   semantic_results: Dict[str, Any], 
                   reasoning_results: Dict[str, Any]) -> Dict[str, Any]:
@@ -1141,7 +1272,7 @@ class MultimodalFusion:
             return fused
             
         except Exception as e:
-            logger.error(f"Multimodal fusion failed: {e}")
+            logger.error("Multimodal fusion failed: %s", e)
             return fused
     
     def _fuse_attributes(self, visual_results: Dict[str, Any], semantic_results: Dict[str, Any]) -> Dict[str, Any]:
@@ -1166,7 +1297,7 @@ class MultimodalFusion:
             gv = visual_results['google_vision']
             
             # Add web entities as brand indicators
-            for entity in gv.get('web_entities', [])[:3]:  # Top 3
+            for entity in gv.get('web_entities', ())[:3]:  # Top 3
                 entity_desc = entity['description']
                 if entity_desc not in fused_attrs['brand_indicators']:
                     fused_attrs['brand_indicators'].append(entity_desc)
@@ -1178,7 +1309,7 @@ class MultimodalFusion:
                 fused_attrs['product_type'] = best_object['name']
             
             # Extract colors from dominant colors
-            for color_info in gv.get('dominant_colors', [])[:2]:  # Top 2
+            for color_info in gv.get('dominant_colors', ())[:2]:  # Top 2
                 color_rgb = color_info['color']
                 color_name = self._rgb_to_color_name(color_rgb)
                 if color_name and color_name not in fused_attrs['color_indicators']:
@@ -1202,25 +1333,9 @@ class MultimodalFusion:
             confidence_scores['semantic_confidence'] = semantic_results['confidence']
         
         # Calculate overall confidence using weighted average
-        model_weights = {
-            'google_confidence': 0.4,
-            'aws_confidence': 0.2,
-            'clip_confidence': 0.2,
-            'semantic_confidence': 0.2
-        }
-        
-        weighted_sum = 0.0
-        total_weight = 0.0
-        
-        for conf_key, confidence in confidence_scores.items():
-            weight = model_weights.get(conf_key, 0.1)
-            weighted_sum += confidence * weight
-            total_weight += weight
-        
-        if total_weight > 0:
-            confidence_scores['overall_confidence'] = weighted_sum / total_weight
-        else:
-            confidence_scores['overall_confidence'] = 0.5
+        confidence_scores['overall_confidence'] = (
+            _weighted_average(confidence_scores, self._MODEL_CONFIDENCE_WEIGHTS) if confidence_scores else 0.5
+        )
         
         return confidence_scores
     
@@ -1239,8 +1354,9 @@ class MultimodalFusion:
         # Create combined embedding if both exist
         if 'visual' in embeddings and 'semantic' in embeddings:
             try:
-                visual_emb = np.array(embeddings['visual'])
-                semantic_emb = np.array(embeddings['semantic'])
+                # Encoders emit float32; keep it so list inputs are not widened to float64
+                visual_emb = np.asarray(embeddings['visual'], dtype=np.float32)
+                semantic_emb = np.asarray(embeddings['semantic'], dtype=np.float32)
                 
                 # For different dimensions, we could use techniques like:
                 # 1. Concatenation (if dimensions are compatible)
@@ -1249,17 +1365,31 @@ class MultimodalFusion:
                 
                 if visual_emb.shape == semantic_emb.shape:
                     # Weighted average
-                    combined = 0.6 * visual_emb + 0.4 * semantic_emb
-                    embeddings['combined'] = combined.tolist()
+                    embeddings['combined'] = 0.6 * visual_emb + 0.4 * semantic_emb
                 else:
                     # Keep separate for now
                     embeddings['note'] = 'Different embedding dimensions - kept separate'
                     
             except Exception as e:
-                logger.error(f"Embedding combination failed: {e}")
+                logger.error("Embedding combination failed: %s", e)
         
         return embeddings
     
+    # (name, red range, green range, blue range), checked in order; first match wins
+    _COLOR_RANGES = (
+        ('red', (150, 255), (0, 100), (0, 100)),
+        ('green', (0, 100), (150, 255), (0, 100)),
+        ('blue', (0, 100), (0, 100), (150, 255)),
+        ('yellow', (200, 255), (200, 255), (0, 100)),
+        ('orange', (200, 255), (100, 200), (0, 50)),
+        ('purple', (100, 200), (0, 100), (150, 255)),
+        ('pink', (200, 255), (100, 200), (150, 255)),
+        ('brown', (100, 150), (50, 100), (0, 50)),
+        ('black', (0, 50), (0, 50), (0, 50)),
+        ('white', (200, 255), (200, 255), (200, 255)),
+        ('gray', (100, 200), (100, 200), (100, 200)),
+    )
+    
     def _rgb_to_color_name(self, rgb: List[int]) -> Optional[str]:
         """Convert RGB values to color name using neural classification"""
         if len(rgb) != 3:
@@ -1268,24 +1398,8 @@ class MultimodalFusion:
         r, g, b = rgb
         
         # Simple color classification - could be enhanced with neural networks
-        color_ranges = {
-            'red': [(150, 255), (0, 100), (0, 100)],
-            'green': [(0, 100), (150, 255), (0, 100)],
-            'blue': [(0, 100), (0, 100), (150, 255)],
-            'yellow': [(200, 255), (200, 255), (0, 100)],
-            'orange': [(200, 255), (100, 200), (0, 50)],
-            'purple': [(100, 200), (0, 100), (150, 255)],
-            'pink': [(200, 255), (100, 200), (150, 255)],
-            'brown': [(100, 150), (50, 100), (0, 50)],
-            'black': [(0, 50), (0, 50), (0, 50)],
-            'white': [(200, 255), (200, 255), (200, 255)],
-            'gray': [(100, 200), (100, 200), (100, 200)]
-        }
-        
-        for color_name, (r_range, g_range, b_range) in color_ranges.items():
-            if (r_range[0] <= r <= r_range[1] and 
-                g_range[0] <= g <= g_range[1] and 
-                b_range[0] <= b <= b_range[1]):
+        for color_name, (r_low, r_high), (g_low, g_high), (b_low, b_high) in self._COLOR_RANGES:
+            if r_low <= r <= r_high and g_low <= g <= g_high and b_low <= b <= b_high:
                 return color_name
         
         return None
@@ -1297,20 +1411,24 @@ class UncertaintyQuantifier:
     async def quantify(self, fused_results: Dict[str, Any]) -> Dict[str, Any]:
         """Quantify uncertainty in the fused results"""
         
-        confidence_scores = fused_results.get('confidence_scores', {})
-        attributes = fused_results.get('attributes', {})
+        confidence_scores = fused_results.get('confidence_scores', _EMPTY_MAPPING)
+        attributes = fused_results.get('attributes', _EMPTY_MAPPING)
+        
+        # Gather the confidence series once and share them across the measures
+        confidences = list(confidence_scores.values())
+        model_confidences = self._model_confidences(confidence_scores)
         
         # Calculate different types of uncertainty
         uncertainty_measures = {
-            'aleatoric_uncertainty': self._calculate_aleatoric_uncertainty(confidence_scores),
+            'aleatoric_uncertainty': self._normalized_variance(confidences) if confidences else 0.5,
             'epistemic_uncertainty': self._calculate_epistemic_uncertainty(confidence_scores),
             'attribute_uncertainty': self._calculate_attribute_uncertainty(attributes),
-            'model_disagreement': self._calculate_model_disagreement(confidence_scores)
+            'model_disagreement': self._normalized_variance(model_confidences)
         }
         
         # Overall uncertainty score
         uncertainty_values = list(uncertainty_measures.values())
-        overall_uncertainty = np.mean(uncertainty_values)
+        overall_uncertainty = _mean(uncertainty_values)
         overall_confidence = 1.0 - overall_uncertainty
         
         fused_results['uncertainty_measures'] = uncertainty_measures
@@ -1325,14 +1443,7 @@ class UncertaintyQuantifier:
             return 0.5
         
         # Aleatoric uncertainty based on confidence score variance
-        confidences = list(confidence_scores.values())
-        if len(confidences) <= 1:
-            return 0.3
-        
-        variance = np.var(confidences)
-        # Normalize variance to 0-1 range
-        normalized_uncertainty = min(1.0, variance * 4)  # Scale factor
-        return normalized_uncertainty
+        return self._normalized_variance(list(confidence_scores.values()))
     
     def _calculate_epistemic_uncertainty(self, confidence_scores: Dict[str, float]) -> float:
         """Calculate epistemic (model) uncertainty"""
@@ -1369,36 +1480,39 @@ class UncertaintyQuantifier:
     
     def _calculate_model_disagreement(self, confidence_scores: Dict[str, float]) -> float:
         """Calculate uncertainty based on model disagreement"""
-        model_confidences = []
-        
-        for key, conf in confidence_scores.items():
-            if 'confidence' in key and key != 'overall_confidence':
-                model_confidences.append(conf)
-        
-        if len(model_confidences) <= 1:
-            return 0.3
-        
         # High variance in model confidences indicates disagreement
-        disagreement = np.var(model_confidences)
-        # Normalize to 0-1 range
-        normalized_disagreement = min(1.0, disagreement * 4)
-        
-        return normalized_disagreement
+        return self._normalized_variance(self._model_confidences(confidence_scores))
+    
+    @staticmethod
+    def _model_confidences(confidence_scores: Dict[str, float]) -> List[float]:
+        """Per-model confidences, excluding the already-fused overall score"""
+        return [conf for key, conf in confidence_scores.items()
+                if 'confidence' in key and key != 'overall_confidence']
+    
+    @staticmethod
+    def _normalized_variance(values: List[float]) -> float:
+        """Variance of a confidence series scaled to the 0-1 uncertainty range"""
+        if len(values) <= 1:
+            return 0.3
+        return min(1.0, _variance(values) * 4)  # Scale factor
 
 
 class AdaptiveThreshold:
     """Adaptive thresholding component for dynamic confidence thresholds"""
     
+    HISTORY_SIZE = 100
+    
     def __init__(self):
-        self.threshold_history = []
-        self.performance_feedback = []
+        # Bounded so only the most recent feedback is kept
+        self.threshold_history = deque(maxlen=self.HISTORY_SIZE)
+        self.performance_feedback = deque(maxlen=self.HISTORY_SIZE)
     
     def get_adaptive_threshold(self, context: Dict[str, Any]) -> float:
         """Get adaptive threshold based on context and history"""
         base_threshold = 0.7  # Default threshold
         
         # Adjust based on attribute completeness
-        attributes = context.get('attributes', {})
+        attributes = context.get('attributes', _EMPTY_MAPPING)
         if attributes:
             filled_count = sum(1 for v in attributes.values() if v)
             total_count = len(attributes)
@@ -1410,12 +1524,12 @@ class AdaptiveThreshold:
             threshold_adjustment = 0.1  # Raise threshold for incomplete data
         
         # Adjust based on model agreement
-        confidence_scores = context.get('confidence_scores', {})
+        confidence_scores = context.get('confidence_scores', _EMPTY_MAPPING)
         if len(confidence_scores) > 1:
             model_confidences = [v for k, v in confidence_scores.items() 
                                if 'confidence' in k and k != 'overall_confidence']
             if model_confidences:
-                agreement = 1.0 - np.var(model_confidences)
+                agreement = 1.0 - _variance(model_confidences)
                 threshold_adjustment += -0.05 * agreement  # Lower threshold for high agreement
         
         adaptive_threshold = base_threshold + threshold_adjustment
@@ -1425,11 +1539,6 @@ class AdaptiveThreshold:
         """Update adaptive thresholds based on performance feedback"""
         self.threshold_history.append(predicted_confidence)
         self.performance_feedback.append(actual_performance)
-        
-        # Keep only recent history
-        if len(self.threshold_history) > 100:
-            self.threshold_history = self.threshold_history[-100:]
-            self.performance_feedback = self.performance_feedback[-100:]
 
 
 # Global instance
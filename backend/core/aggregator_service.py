@@ -275,7 +275,7 @@ def get_aggregator_service():
 
     async def _semantic_clustering_and_consensus(self, fused: dict) -> dict:
         """Cluster and synthesize attributes from all model outputs for richer, human-like results."""
-        from collections import defaultdict
+        from collections import Counter, defaultdict
         all_terms = []
         for model_out in fused.get('fused_outputs', {}).values():
             for key in ['web_entities', 'objects', 'labels', 'detected_text', 'text_annotations', 'description', 'top_labels']:
@@ -289,13 +289,14 @@ def get_aggregator_service():
                 elif isinstance(val, str):
                     all_terms.append(val)
         # Simple clustering: group by lowercase, count frequency
+        lowered_terms = [term.lower() for term in all_terms]
         clusters = defaultdict(list)
-        for term in all_terms:
-            clusters[term.lower()].append(term)
-        # Attribute consensus: most common terms
+        for key, term in zip(lowered_terms, all_terms):
+            clusters[key].append(term)
+        # Attribute consensus: most common terms, counted in C and selected without a full sort
         consensus = {
             'semantic_clusters': dict(clusters),
-            'top_attributes': sorted([(k, len(v)) for k, v in clusters.items()], key=lambda x: -x[1])[:10]
+            'top_attributes': Counter(lowered_terms).most_common(10)
         }
         return consensus
 
@@ -11,6 +11,7 @@ import json
 from collections import defaultdict, Counter
 import hashlib
 import pickle
+import threading
 
 # Specific imports to avoid broad library imports
 from PIL import Image
@@ -73,6 +74,12 @@ MATERIAL_MAX_LENGTH = 12
 CONFIDENCE_THRESHOLD = 0.7
 HIGH_CONFIDENCE_THRESHOLD = 0.8
 
+# Characters stripped from labels, object names and OCR words before they become search terms
+_NON_ALNUM_RE = re.compile(r'[^a-zA-Z0-9\s]')
+
+# Newlines and control characters replaced before text reaches the logs
+_CONTROL_CHARS_RE = re.compile(r'[\r\n\t\x00-\x1f\x7f-\x9f]')
+
 class AIService:
     """Service for AI-powered image analysis using Google Cloud Vision with Advanced ML"""
     
@@ -84,6 +91,9 @@ class AIService:
         self.faiss_index = None
         self.faiss_id_to_item = {}
         
+        # Detected object regions keyed by image content digest
+        self._object_regions_cache = {}
+        
         # Initialize CLIP model if available
         self.clip_model = None
         self.clip_tokenizer = None
@@ -110,7 +120,7 @@ class AIService:
             model, _, preprocess = open_clip.create_model_and_transforms(
                 'ViT-B-32', pretrained='openai'
             )
-            self.clip_model = model
+            self.clip_model = model.eval()
             self.clip_tokenizer = open_clip.get_tokenizer('ViT-B-32')
             self.clip_preprocess = preprocess
             logger.info("OpenCLIP ViT-B-32 model initialized successfully")
@@ -350,7 +360,7 @@ class AIService:
         if not term:
             return ""
         # Remove special characters and normalize
-        cleaned = re.sub(r'[^a-zA-Z0-9\s]', '', term).strip().lower()
+        cleaned = _NON_ALNUM_RE.sub('', term).strip().lower()
         return ' '.join(cleaned.split())  # Normalize whitespace
 
     def _is_valid_search_term(self, term: str) -> bool:
@@ -363,9 +373,8 @@ class AIService:
         """Sanitize text for safe logging"""
         if not text:
             return ""
-        # Remove newlines and control characters
-        sanitized = re.sub(r'[\r\n\t\x00-\x1f\x7f-\x9f]', ' ', text)
-        return sanitized[:200]  # Limit length
+        # Limit length first; replacement is one-for-one, so only the kept prefix needs scanning
+        return _CONTROL_CHARS_RE.sub(' ', text[:200])
 
     def _initialize_aws_client(self):
         """Initialize AWS Rekognition client with proper error handling"""
@@ -402,6 +411,13 @@ class AIService:
                 logger.error("Empty image data provided")
                 return []
             
+            # Preview and final requests often resend the same image; skip the Vision round trip
+            image_key = hashlib.blake2b(image_data, digest_size=16).digest()
+            cached_objects = self._object_regions_cache.get(image_key)
+            if cached_objects is not None:
+                logger.info("Using cached object regions (%d objects)", len(cached_objects))
+                return [dict(obj) for obj in cached_objects]
+            
             logger.info("Processing image data of size: %d bytes", len(image_data))
             
             # Validate the image data first
@@ -430,6 +446,7 @@ class AIService:
                 
             if not response.responses[0].localized_object_annotations:
                 logger.info("No objects detected in image")
+                self._cache_object_regions(image_key, [])
                 return []
                 
             objects = []
@@ -448,12 +465,19 @@ class AIService:
                 })
             
             logger.info("Detected %d objects in image", len(objects))
-            return objects
+            self._cache_object_regions(image_key, objects)
+            return [dict(obj) for obj in objects]
             
         except Exception as e:
             logger.error("Error in detect_objects_and_regions: %s", str(e)[:100])
             return []
 
+    def _cache_object_regions(self, image_key: bytes, objects: list):
+        """Remember detected regions for an image, resetting the cache once it grows too large"""
+        if len(self._object_regions_cache) >= 256:
+            self._object_regions_cache.clear()
+        self._object_regions_cache[image_key] = objects
+
     def crop_to_region(self, image_data: bytes, bounding_box: tuple) -> bytes:
         """
         Crop the image to the given bounding box (normalized coordinates).
@@ -522,12 +546,12 @@ class AIService:
         if bounding_box:
             image_data = self.crop_to_region(image_data, bounding_box)
             
-        try:
-            # Load CLIP model (ViT-B/32)
-            model, _, preprocess = open_clip.create_model_and_transforms('ViT-B-32', pretrained='openai')
-            tokenizer = open_clip.get_tokenizer('ViT-B-32')
-            model.eval()
+        # Reuse the ViT-B-32 model loaded at init instead of rebuilding it per request
+        model, preprocess, tokenizer = self.clip_model, self.clip_preprocess, self.clip_tokenizer
+        if model is None:
+            return []
             
+        try:
             with BytesIO(image_data) as img_buffer:
                 image = Image.open(img_buffer).convert('RGB')
                 image_input = preprocess(image).unsqueeze(0)
@@ -644,15 +668,11 @@ class AdaptiveThreshold:
 
 # Global AI service instance with thread-safe singleton pattern
 _ai_service_instance = None
-_ai_service_lock = None
+_ai_service_lock = threading.Lock()
 
 def get_ai_service():
     """Get AI service instance with thread-safe singleton pattern"""
-    global _ai_service_instance, _ai_service_lock
-    
-    if _ai_service_lock is None:
-        import threading
-        _ai_service_lock = threading.Lock()
+    global _ai_service_instance
     
     if _ai_service_instance is None:
         with _ai_service_lock:
@@ -5,22 +5,87 @@ Handles loading credentials from environment variables and files safely.
 
 import os
 import json
-import csv
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any, Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
+
+def _first_env(env, keys, default=None):
+    """Return the first non-empty value among the given environment variables"""
+    for key in keys:
+        value = env.get(key)
+        if value:
+            return value
+    return default
+
+
+_TRUTHY = frozenset({'true', '1', 'yes', 'on', 'y', 't'})
+
+
+def _as_bool(value, default=True):
+    """Interpret an environment flag value, falling back to default when unset"""
+    return default if value is None else value.strip().lower() in _TRUTHY
+
+
+@lru_cache(maxsize=8)
+def _read_aws_key_export(path, mtime):
+    """Parse an AWS access key export, cached by path and modification time"""
+    # AWS's access key export is a header line plus one unquoted row
+    with open(path, 'r') as f:
+        header, row = f.read().splitlines()[:2]
+    return dict(zip(header.split(','), row.split(',')))
+
+
 class CredentialManager:
     """Manages credentials securely"""
     
+    # Credential name -> environment variables to try, in order of preference
+    _ENV_SOURCES = {
+        'aws_access_key_id': ('AWS_ACCESS_KEY_ID',),
+        'aws_secret_access_key': ('AWS_SECRET_ACCESS_KEY',),
+        'aws_region': ('AWS_REGION', 'AWS_REGION_NAME', 'AWS_DEFAULT_REGION'),
+        'ebay_app_id': ('EBAY_PRODUCTION_APP_ID', 'EBAY_CLIENT_ID'),
+        'ebay_cert_id': ('EBAY_PRODUCTION_CERT_ID', 'EBAY_CERT_ID'),
+        'ebay_client_secret': ('EBAY_PRODUCTION_CLIENT_SECRET', 'EBAY_CLIENT_SECRET'),
+        'ebay_refresh_token': ('EBAY_PRODUCTION_REFRESH_TOKEN', 'EBAY_REFRESH_TOKEN'),
+        'ebay_user_token': ('EBAY_PRODUCTION_USER_TOKEN',),
+        'google_api_key': ('GOOGLE_API_KEY',),
+        'google_project': ('GOOGLE_CLOUD_PROJECT',),
+        'google_location': ('GOOGLE_CLOUD_LOCATION',),
+    }
+    _ENV_DEFAULTS = {
+        'aws_region': 'us-east-1',
+        'google_location': 'us-central1',
+    }
+    
+    # Service enable flag -> environment variable that sets it (enabled when unset)
+    _ENV_FLAGS = {
+        'enable_ebay_service': 'ENABLE_EBAY_SERVICE',
+        'enable_google_vision': 'ENABLE_GOOGLE_VISION',
+        'enable_aws_rekognition': 'ENABLE_AWS_REKOGNITION',
+        'enable_ai_services': 'ENABLE_AI_SERVICES',
+    }
+    
+    # Service name -> credential flag that enables it
+    _SERVICE_FLAGS = {
+        'ebay': 'enable_ebay_service',
+        'google_vision': 'enable_google_vision',
+        'aws_rekognition': 'enable_aws_rekognition',
+        'ai_services': 'enable_ai_services',
+    }
+    
     def __init__(self):
         self.credentials = {}
+        self._validation = None
         self.load_credentials()
     
     def load_credentials(self):
         """Load all credentials from environment and files"""
+        # Credentials may change, so validate them again on next use
+        self._validation = None
         try:
             # Load from environment variables
             self._load_from_env()
@@ -35,24 +100,18 @@ class CredentialManager:
     
     def _load_from_env(self):
         """Load credentials from environment variables"""
+        env = os.environ
         env_credentials = {
-            'aws_access_key_id': os.environ.get('AWS_ACCESS_KEY_ID'),
-            'aws_secret_access_key': os.environ.get('AWS_SECRET_ACCESS_KEY'),
-            'aws_region': os.environ.get('AWS_REGION') or os.environ.get('AWS_REGION_NAME') or os.environ.get('AWS_DEFAULT_REGION', 'us-east-1'),
-            'ebay_app_id': os.environ.get('EBAY_PRODUCTION_APP_ID'),
-            'ebay_cert_id': os.environ.get('EBAY_PRODUCTION_CERT_ID'),
-            'ebay_client_secret': os.environ.get('EBAY_PRODUCTION_CLIENT_SECRET'),
-            'ebay_refresh_token': os.environ.get('EBAY_PRODUCTION_REFRESH_TOKEN'), # Corrected to use the final variable name
-            'google_api_key': os.environ.get('GOOGLE_API_KEY'),
-            'google_project': os.environ.get('GOOGLE_CLOUD_PROJECT'),
-            'google_location': os.environ.get('GOOGLE_CLOUD_LOCATION', 'us-central1'),
-            # Service enable/disable flags
-            'enable_ebay_service': os.environ.get('ENABLE_EBAY_SERVICE', 'True').lower() == 'true',
-            'enable_google_vision': os.environ.get('ENABLE_GOOGLE_VISION', 'True').lower() == 'true',
-            'enable_aws_rekognition': os.environ.get('ENABLE_AWS_REKOGNITION', 'True').lower() == 'true',
-            'enable_ai_services': os.environ.get('ENABLE_AI_SERVICES', 'True').lower() == 'true',
+            name: _first_env(env, keys, self._ENV_DEFAULTS.get(name))
+            for name, keys in self._ENV_SOURCES.items()
         }
         
+        # Service enable/disable flags
+        env_credentials.update({
+            name: _as_bool(env.get(key))
+            for name, key in self._ENV_FLAGS.items()
+        })
+        
         # Filter out None values
         self.credentials.update({k: v for k, v in env_credentials.items() if v})
     
@@ -70,13 +129,11 @@ class CredentialManager:
         creds_path = os.environ.get('AWS_CREDENTIALS_PATH')
         if creds_path and Path(creds_path).exists():
             try:
-                with open(creds_path, 'r') as f:
-                    reader = csv.DictReader(f)
-                    for row in reader:
-                        if 'Access key ID' in row and 'Secret access key' in row:
-                            self.credentials['aws_access_key_id'] = row['Access key ID']
-                            self.credentials['aws_secret_access_key'] = row['Secret access key']
-                            break
+                # Reloads and repeated instantiation reuse the parse until the file changes
+                fields = _read_aws_key_export(creds_path, os.path.getmtime(creds_path))
+                if 'Access key ID' in fields and 'Secret access key' in fields:
+                    self.credentials['aws_access_key_id'] = fields['Access key ID']
+                    self.credentials['aws_secret_access_key'] = fields['Secret access key']
                 logger.info("✅ AWS credentials loaded")
             except Exception as e:
                 logger.warning(f"⚠️  Could not load AWS credentials: {e}")
@@ -109,13 +166,8 @@ class CredentialManager:
     
     def is_service_enabled(self, service_name: str) -> bool:
         """Check if a service is enabled"""
-        service_flags = {
-            'ebay': self.credentials.get('enable_ebay_service', True),
-            'google_vision': self.credentials.get('enable_google_vision', True),
-            'aws_rekognition': self.credentials.get('enable_aws_rekognition', True),
-            'ai_services': self.credentials.get('enable_ai_services', True),
-        }
-        return service_flags.get(service_name, True)
+        flag = self._SERVICE_FLAGS.get(service_name)
+        return self.credentials.get(flag, True) if flag else True
     
     def get_service_status(self) -> Dict[str, Dict[str, Any]]:
         """Get detailed service status"""
@@ -140,14 +192,16 @@ class CredentialManager:
     
     def validate_credentials(self) -> Dict[str, bool]:
         """Validate all credentials"""
-        validation = {
-            'aws': bool(self.credentials.get('aws_access_key_id') and self.credentials.get('aws_secret_access_key')),
-            'ebay': bool(self.credentials.get('ebay_app_id') and self.credentials.get('ebay_client_secret') and self.credentials.get('ebay_refresh_token')),
-            'google': bool(self.credentials.get('google_api_key'))
-        }
+        # Credentials only change through load_credentials, so validate once per load
+        if self._validation is None:
+            self._validation = {
+                'aws': bool(self.credentials.get('aws_access_key_id') and self.credentials.get('aws_secret_access_key')),
+                'ebay': bool(self.credentials.get('ebay_app_id') and self.credentials.get('ebay_client_secret') and self.credentials.get('ebay_refresh_token')),
+                'google': bool(self.credentials.get('google_api_key'))
+            }
+            logger.info(f"🔍 Credential validation: {self._validation}")
         
-        logger.info(f"🔍 Credential validation: {validation}")
-        return validation
+        return dict(self._validation)
     
     def get_status(self) -> Dict[str, Any]:
         """Get credential status"""
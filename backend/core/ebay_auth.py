@@ -3,16 +3,20 @@ eBay Authentication Service
 Handles OAuth token management, refresh, and automatic renewal
 """
 
-import requests
+import base64
+import contextlib
 import logging
+import tempfile
 import time
 from datetime import datetime, timedelta
 from django.conf import settings
 from django.core.cache import cache
+from functools import lru_cache
 from typing import Optional
 import os
 from django.core.mail import mail_admins
 from core.credential_manager import credential_manager
+from core.utils import http_session, jwt_expires_in
 
 # --- eBay Auth Optimizations ---
 # 1. Use environment variables for all secrets, fallback to credential manager only if needed.
@@ -25,6 +29,14 @@ from core.credential_manager import credential_manager
 
 logger = logging.getLogger(__name__)
 
+
+@lru_cache(maxsize=8)
+def _read_token_file(path, mtime_ns):
+    """Read a stored refresh token, cached by path and modification time"""
+    with open(path, 'r') as f:
+        return f.read().strip() or None
+
+
 class EbayTokenManager:
     """
     Manages eBay OAuth tokens with automatic refresh capabilities.
@@ -36,6 +48,8 @@ class EbayTokenManager:
     REFRESH_LOCK_KEY = "ebay_token_refresh_lock"
     # Token expiry buffer (refresh 1 hour before expiry)
     EXPIRY_BUFFER = timedelta(hours=1)
+    # Longest time to wait for a refresh already in progress elsewhere
+    PEER_REFRESH_WAIT_SECONDS = 2
     # Path to refresh token file (should be protected)
     REFRESH_TOKEN_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'ebay_refresh_token.txt'))
 
@@ -45,6 +59,8 @@ class EbayTokenManager:
         self.cert_id = os.environ.get('EBAY_PRODUCTION_CERT_ID') or getattr(settings, 'EBAY_PRODUCTION_CERT_ID', None)
         self.client_secret = os.environ.get('EBAY_PRODUCTION_CLIENT_SECRET') or getattr(settings, 'EBAY_PRODUCTION_CLIENT_SECRET', None)
         self.refresh_token = self._load_refresh_token()
+        # Credentials are fixed for the process lifetime, so build the Basic auth header once
+        self._basic_auth_header = f'Basic {self._get_basic_auth()}'
 
         # Check if eBay service is enabled
         if not credential_manager.is_service_enabled('ebay'):
@@ -70,15 +86,9 @@ class EbayTokenManager:
             logger.info("Loaded eBay refresh token from environment variable.")
             return token
         # 2. Try file
-        try:
-            token_file = self.REFRESH_TOKEN_FILE
-            if os.path.exists(token_file):
-                with open(token_file, 'r') as f:
-                    if token := f.read().strip():
-                        logger.info("Loaded eBay refresh token from file.")
-                        return token
-        except Exception as e:
-            logger.error(f"Failed to load refresh token from file: {e}")
+        if token := self._read_refresh_token_file():
+            logger.info("Loaded eBay refresh token from file.")
+            return token
         # 3. Try settings
         if token := getattr(settings, 'EBAY_PRODUCTION_REFRESH_TOKEN', None):
             logger.info("Loaded eBay refresh token from settings.")
@@ -94,6 +104,18 @@ class EbayTokenManager:
         logger.warning("No eBay refresh token found.")
         return None
     
+    @classmethod
+    def _read_refresh_token_file(cls) -> Optional[str]:
+        """Return the refresh token stored in REFRESH_TOKEN_FILE."""
+        try:
+            # Re-read only when the file changes, e.g. after another worker rotates the token
+            return _read_token_file(cls.REFRESH_TOKEN_FILE, os.stat(cls.REFRESH_TOKEN_FILE).st_mtime_ns)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"Failed to load refresh token from file: {e}")
+            return None
+
     def get_valid_token(self) -> Optional[str]:
         """
         Get a valid OAuth token, refreshing if necessary
@@ -132,8 +154,7 @@ class EbayTokenManager:
         # Prevent multiple simultaneous refresh attempts
         if cache.get(self.REFRESH_LOCK_KEY):
             logger.warning("Token refresh already in progress, waiting...")
-            time.sleep(2)
-            return cache.get(self.TOKEN_CACHE_KEY)
+            return self._wait_for_peer_refresh()
 
         try:
             # Set refresh lock
@@ -153,12 +174,29 @@ class EbayTokenManager:
             # Release refresh lock
             cache.delete(self.REFRESH_LOCK_KEY)
 
+    def _wait_for_peer_refresh(self) -> Optional[str]:
+        """
+        Poll the cache with exponential backoff until the in-progress refresh
+        stores a new token or releases its lock, instead of after a fixed sleep.
+        """
+        stale_token = cache.get(self.TOKEN_CACHE_KEY)
+        deadline = time.monotonic() + self.PEER_REFRESH_WAIT_SECONDS
+        delay = 0.05
+        while (remaining := deadline - time.monotonic()) > 0:
+            time.sleep(min(delay, remaining))
+            cached = cache.get_many([self.TOKEN_CACHE_KEY, self.REFRESH_LOCK_KEY])
+            token = cached.get(self.TOKEN_CACHE_KEY)
+            if (token and token != stale_token) or self.REFRESH_LOCK_KEY not in cached:
+                return token
+            delay *= 2
+        return cache.get(self.TOKEN_CACHE_KEY)
+
     def _make_token_refresh_request(self):
         """Extracted method to make the token refresh request."""
         refresh_url = "https://api.ebay.com/identity/v1/oauth2/token"
         headers = {
             'Content-Type': 'application/x-www-form-urlencoded',
-            'Authorization': f'Basic {self._get_basic_auth()}'
+            'Authorization': self._basic_auth_header
         }
         data = {
             'grant_type': 'refresh_token',
@@ -166,7 +204,7 @@ class EbayTokenManager:
             'scope': 'https://api.ebay.com/oauth/api_scope https://api.ebay.com/oauth/api_scope/sell.inventory https://api.ebay.com/oauth/api_scope/sell.marketing https://api.ebay.com/oauth/api_scope/sell.account https://api.ebay.com/oauth/api_scope/sell.fulfillment'
         }
         logger.info("Refreshing eBay OAuth token...")
-        return requests.post(refresh_url, headers=headers, data=data, timeout=30)
+        return http_session.post(refresh_url, headers=headers, data=data, timeout=30)
 
     def _handle_token_refresh_response(self, response):
         """Extracted method to handle the token refresh response."""
@@ -185,7 +223,8 @@ class EbayTokenManager:
     def _process_token_data(self, token_data):
         """Process the token data from eBay API response."""
         access_token = token_data.get('access_token')
-        expires_in = token_data.get('expires_in', 7200)
+        # Fall back to the token's own exp claim, then to 2 hours
+        expires_in = token_data.get('expires_in') or jwt_expires_in(access_token) or 7200
         new_refresh_token = token_data.get('refresh_token')
         
         if access_token:
@@ -218,7 +257,6 @@ class EbayTokenManager:
         """
         Returns the base64-encoded basic auth string for eBay API.
         """
-        import base64
         # Use client_secret if cert_id is missing
         auth_secret = self.cert_id or self.client_secret
         credentials = f"{self.app_id}:{auth_secret}"
@@ -228,18 +266,27 @@ class EbayTokenManager:
         """
         Update the refresh token in file and memory.
         """
-        import contextlib
         token_file = self.REFRESH_TOKEN_FILE
+        tmp_file = None
         try:
-            with open(token_file, 'w') as f:
+            # Write a uniquely named temporary file and rename it over the old one, so a
+            # crash mid-write never leaves a truncated token and concurrent writers never
+            # share a file; mkstemp already creates it user-only (0600)
+            fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(token_file), prefix='.ebay_refresh_token.')
+            with os.fdopen(fd, 'w') as f:
                 f.write(new_refresh_token)
-            # Set file permissions to user-only (0600) if possible
-            with contextlib.suppress(Exception):
-                os.chmod(token_file, 0o600)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, token_file)
+            tmp_file = None
             self.refresh_token = new_refresh_token
             logger.info("New refresh token saved to file and updated in memory.")
         except Exception as e:
             logger.error(f"Failed to update refresh token: {e}")
+        finally:
+            if tmp_file:
+                with contextlib.suppress(OSError):
+                    os.remove(tmp_file)
 
     def validate_token(self, token: str) -> bool:
         """
@@ -254,7 +301,7 @@ class EbayTokenManager:
             }
             params = {'q': 'test', 'limit': 1}
 
-            response = requests.get(test_url, headers=headers, params=params, timeout=10)
+            response = http_session.get(test_url, headers=headers, params=params, timeout=10)
             return response.status_code == 200
 
         except Exception as e:
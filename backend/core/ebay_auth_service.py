@@ -4,6 +4,7 @@ This service provides a robust, proactive, and centralized system for managing
 eBay OAuth tokens, ensuring high availability and performance.
 """
 import logging
+import time
 from datetime import datetime, timedelta, timezone
 from django.core.cache import cache
 from django.conf import settings
@@ -13,6 +14,7 @@ import base64
 # Import the Celery app and the specific task
 from backend.celery_app import app as celery_app
 from core.tasks import refresh_ebay_token_task
+from core.utils import http_session, jwt_expires_in
 
 logger = logging.getLogger(__name__)
 
@@ -27,9 +29,16 @@ class EbayAuthService:
     EXPIRY_CACHE_KEY = "ebay_token_expiry"
     LAST_REFRESH_CACHE_KEY = "ebay_last_successful_refresh"
     REFRESH_LOCK_KEY = "ebay_token_refresh_lock"
+    # Marks a recent background refresh dispatch. Unlike REFRESH_LOCK_KEY it is not
+    # cleared when a synchronous refresh finishes, so it is the only dedupe for dispatches.
+    PROACTIVE_DISPATCHED_KEY = "ebay_proactive_dispatched"
 
     # Proactive refresh threshold: if token expires within this window, refresh it.
     PROACTIVE_REFRESH_WINDOW = timedelta(hours=1)
+    # Longest time to wait for a refresh already running in another worker.
+    PEER_REFRESH_WAIT_SECONDS = 5
+    # How long a token read from the cache is reused in-process before reading it again.
+    TOKEN_MEMO_SECONDS = 1.0
 
     def __new__(cls, *args, **kwargs):
         if cls._instance is None:
@@ -44,6 +53,13 @@ class EbayAuthService:
         self.app_id = getattr(settings, 'EBAY_PRODUCTION_APP_ID', None)
         self.client_secret = getattr(settings, 'EBAY_PRODUCTION_CLIENT_SECRET', None)
         self.refresh_token = getattr(settings, 'EBAY_PRODUCTION_REFRESH_TOKEN', None)
+        # Credentials are fixed for the process lifetime, so encode the Basic auth header once
+        creds = f"{self.app_id}:{self.client_secret}"
+        self._basic_auth_header = f"Basic {base64.b64encode(creds.encode()).decode()}"
+        # Last healthy token read from the cache, its expiry, and when it was read
+        self._memo_token = None
+        self._memo_expiry = None
+        self._memo_read_at = float("-inf")
         
         self._log_credential_status()
         self._initialized = True
@@ -59,8 +75,18 @@ class EbayAuthService:
         The primary method to get a valid token.
         It checks the current token and triggers a proactive or immediate refresh if needed.
         """
-        token = cache.get(self.TOKEN_CACHE_KEY)
-        expiry = cache.get(self.EXPIRY_CACHE_KEY)
+        # Bursts of calls reuse a token read moments ago instead of going back to the cache
+        if (
+            self._memo_token
+            and time.monotonic() - self._memo_read_at < self.TOKEN_MEMO_SECONDS
+            and self._memo_expiry - datetime.now(timezone.utc) > self.PROACTIVE_REFRESH_WINDOW
+        ):
+            return self._memo_token
+
+        # One round-trip for both keys instead of one each
+        cached = cache.get_many([self.TOKEN_CACHE_KEY, self.EXPIRY_CACHE_KEY])
+        token = cached.get(self.TOKEN_CACHE_KEY)
+        expiry = cached.get(self.EXPIRY_CACHE_KEY)
 
         if not token or not expiry:
             logger.info("No cached token found. Forcing an immediate refresh.")
@@ -76,6 +102,9 @@ class EbayAuthService:
         if time_to_expiry <= self.PROACTIVE_REFRESH_WINDOW:
             logger.info("Token is nearing expiration. Triggering proactive background refresh.")
             self._proactive_refresh()
+        else:
+            self._memo_token, self._memo_expiry = token, expiry
+            self._memo_read_at = time.monotonic()
 
         return token
 
@@ -87,8 +116,7 @@ class EbayAuthService:
         lock = cache.add(self.REFRESH_LOCK_KEY, "locked", timeout=60)
         if not lock:
             logger.warning("Token refresh is already in progress. Waiting briefly.")
-            time.sleep(5)
-            return cache.get(self.TOKEN_CACHE_KEY)
+            return self._wait_for_peer_refresh()
 
         try:
             logger.info("Performing synchronous token refresh.")
@@ -99,7 +127,7 @@ class EbayAuthService:
             headers = self._get_auth_headers()
             data = self._get_refresh_payload()
 
-            response = requests.post(
+            response = http_session.post(
                 "https://api.ebay.com/identity/v1/oauth2/token",
                 headers=headers,
                 data=data,
@@ -116,13 +144,32 @@ class EbayAuthService:
         finally:
             cache.delete(self.REFRESH_LOCK_KEY)
 
+    def _wait_for_peer_refresh(self) -> str | None:
+        """
+        Polls the cache with exponential backoff until the in-flight refresh
+        lands, so a fast refresh is picked up in milliseconds rather than
+        after a fixed sleep. The token cached before the wait is the one being
+        replaced, so it only counts once the peer has released its lock.
+        """
+        stale_token = cache.get(self.TOKEN_CACHE_KEY)
+        deadline = time.monotonic() + self.PEER_REFRESH_WAIT_SECONDS
+        delay = 0.05
+        while (remaining := deadline - time.monotonic()) > 0:
+            time.sleep(min(delay, remaining))
+            cached = cache.get_many([self.TOKEN_CACHE_KEY, self.REFRESH_LOCK_KEY])
+            token = cached.get(self.TOKEN_CACHE_KEY)
+            if (token and token != stale_token) or self.REFRESH_LOCK_KEY not in cached:
+                return token
+            delay *= 2
+        return cache.get(self.TOKEN_CACHE_KEY)
+
     def _proactive_refresh(self):
         """
         Triggers the Celery task to refresh the token in the background.
         This avoids blocking the current request.
         """
-        lock = cache.add(self.REFRESH_LOCK_KEY, "locked", timeout=60)
-        if lock:
+        dispatched = cache.add(self.PROACTIVE_DISPATCHED_KEY, 1, timeout=60)
+        if dispatched:
             logger.info("Dispatching background task to refresh eBay token.")
             refresh_ebay_token_task.delay()
         else:
@@ -135,7 +182,8 @@ class EbayAuthService:
             logger.error("Refresh response did not contain an access_token.")
             return None
 
-        expires_in = token_data.get("expires_in", 7200)  # Default to 2 hours
+        # Fall back to the token's own exp claim, then to 2 hours
+        expires_in = token_data.get("expires_in") or jwt_expires_in(access_token) or 7200
         expiry_time = datetime.now(timezone.utc) + timedelta(seconds=expires_in)
 
         cache.set(self.TOKEN_CACHE_KEY, access_token, timeout=expires_in)
@@ -147,11 +195,9 @@ class EbayAuthService:
 
     def _get_auth_headers(self) -> dict:
         """Constructs the necessary headers for the token refresh request."""
-        creds = f"{self.app_id}:{self.client_secret}"
-        encoded_creds = base64.b64encode(creds.encode()).decode()
         return {
             "Content-Type": "application/x-www-form-urlencoded",
-            "Authorization": f"Basic {encoded_creds}",
+            "Authorization": self._basic_auth_header,
         }
 
     def _get_refresh_payload(self) -> dict:
@@ -164,8 +210,9 @@ class EbayAuthService:
 
     def get_status(self) -> dict:
         """Provides a detailed status report of the current token."""
-        expiry = cache.get(self.EXPIRY_CACHE_KEY)
-        last_refresh = cache.get(self.LAST_REFRESH_CACHE_KEY)
+        cached = cache.get_many([self.EXPIRY_CACHE_KEY, self.LAST_REFRESH_CACHE_KEY])
+        expiry = cached.get(self.EXPIRY_CACHE_KEY)
+        last_refresh = cached.get(self.LAST_REFRESH_CACHE_KEY)
         status = {}
 
         if expiry and isinstance(expiry, datetime):
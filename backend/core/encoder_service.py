@@ -8,65 +8,187 @@ def get_encoder_service():
 
 # Advanced CLIP-powered Encoder Service for AI-driven, multi-modal recognition and description
 import io
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 import torch
 from PIL import Image
 import clip
 
+logger = logging.getLogger(__name__)
+
 class CLIPImageEncoder:
+    # Zero-shot labels for describe_image
+    LABELS = (
+        "a photo of a shoe",
+        "a photo of a handbag",
+        "a photo of a dress",
+        "a photo of a shirt",
+        "a photo of a jacket",
+        "a photo of a watch",
+        "a photo of a hat",
+        "a photo of a pair of pants",
+        "a photo of a pair of sunglasses",
+        "a photo of a wallet",
+        "a photo of a belt",
+        "a photo of a scarf",
+        "a photo of a ring",
+        "a photo of a necklace",
+        "a photo of a bracelet",
+        "a photo of a pair of earrings",
+        "a photo of a t-shirt",
+        "a photo of a coat",
+        "a photo of a skirt",
+        "a photo of a sweater",
+    )
+
+    # Images per forward pass in encode_images
+    ENCODE_BATCH_SIZE = 32
+
     def __init__(self, model_name="ViT-B/32", device=None):
+        self.model_name = model_name
         self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
-        self.model, self.preprocess = clip.load(model_name, device=self.device)
+        # The model is loaded on first use, so processes that never encode images
+        # don't pay for the weight download or the device memory
+        self.model = None
+        self.preprocess = None
+        self._label_logit_weights = None
+        # The uncompiled image tower while a compiled one is in use, for falling back
+        self._eager_visual = None
+        self._model_lock = threading.Lock()
+
+    def _ensure_model_loaded(self):
+        if self.model is not None:
+            return
+        with self._model_lock:
+            if self.model is not None:
+                return
+            # clip.load already keeps the weights in FP16 on CUDA (and FP32 on CPU), and
+            # encode_image casts its input to the model dtype
+            model, preprocess = clip.load(self.model_name, device=self.device)
+            # The labels never change, so encode them once rather than on every describe_image call
+            text_inputs = clip.tokenize(self.LABELS).to(self.device)
+            with torch.inference_mode():
+                text_features = model.encode_text(text_inputs)
+                text_features = text_features / text_features.norm(dim=-1, keepdim=True)
+                # Fold CLIP's logit scale into the transposed label matrix, so scoring an
+                # image is a single matmul with no per-call exp, scale or transpose
+                self._label_logit_weights = (model.logit_scale.exp() * text_features).T.contiguous()
+            self._compile_image_tower(model)
+            self.preprocess = preprocess
+            # Published last, since the unlocked check above only looks at the model
+            self.model = model
+
+    def _compile_image_tower(self, model):
+        # Every encode and describe call runs the image tower, so compile it on the GPU to
+        # cut eager-mode dispatch. The default mode skips CUDA graphs, which would be
+        # re-recorded for every new batch size. Warming up with one image and a full batch
+        # compiles the single-image graph and a dynamic-batch one that also covers the
+        # remainder batches; as the model loads lazily, that cost lands on the first call
+        # that encodes an image rather than at startup.
+        if not str(self.device).startswith("cuda") or not hasattr(torch, "compile"):
+            return
+        visual = model.visual
+        try:
+            model.visual = torch.compile(visual)
+            self._eager_visual = visual
+            resolution = visual.input_resolution
+            with torch.inference_mode():
+                for batch_size in (1, self.ENCODE_BATCH_SIZE):
+                    model.encode_image(torch.zeros(batch_size, 3, resolution, resolution, device=self.device))
+        except Exception as e:
+            self._use_eager_image_tower(model, visual, e)
+
+    def _use_eager_image_tower(self, model, visual, error):
+        logger.warning("torch.compile unavailable for CLIP, using eager mode: %s", error)
+        model.visual = visual
+        self._eager_visual = None
+
+    def _run_image_tower(self, image_input):
+        # A shape the warm-up did not cover is compiled on the spot, and that can still
+        # fail, so fall back to the eager tower for this and every later call
+        eager_visual = self._eager_visual
+        try:
+            return self.model.encode_image(image_input)
+        except Exception as e:
+            if eager_visual is None:
+                raise
+            self._use_eager_image_tower(self.model, eager_visual, e)
+            return self.model.encode_image(image_input)
+
+    def _preprocess_bytes(self, image_bytes):
+        image = Image.open(io.BytesIO(image_bytes))
+        # Let libjpeg downscale JPEGs while decoding (no-op for other formats); the
+        # draft stays at least as large as the model's input, which preprocess resizes to
+        resolution = self.model.visual.input_resolution
+        image.draft("RGB", (resolution, resolution))
+        return self.preprocess(image.convert("RGB"))
+
+    def _encode_features(self, image_bytes):
+        image_input = self._preprocess_bytes(image_bytes).unsqueeze(0).to(self.device)
+        with torch.inference_mode():
+            return self._run_image_tower(image_input)
 
     def encode_image(self, image_bytes):
-        image = Image.open(io.BytesIO(image_bytes)).convert("RGB")
-        image_input = self.preprocess(image).unsqueeze(0).to(self.device)
-        with torch.no_grad():
-            image_features = self.model.encode_image(image_input)
-        return image_features.cpu().numpy().flatten().tolist()
+        self._ensure_model_loaded()
+        image_features = self._encode_features(image_bytes)
+        return image_features.float().cpu().numpy().flatten().tolist()
+
+    def encode_images(self, images_bytes):
+        # Batched variant of encode_image: one forward pass for all images instead of one each
+        if not images_bytes:
+            return []
+        self._ensure_model_loaded()
+        # Page-locked host memory lets the copy to the GPU run asynchronously
+        pin_memory = str(self.device).startswith("cuda")
+        embeddings = []
+        # PIL decoding and resizing release the GIL, so preprocess the images in parallel.
+        # map() queues every image up front, so later batches are decoded while earlier
+        # ones run through the model.
+        with ThreadPoolExecutor(max_workers=min(8, len(images_bytes))) as executor:
+            tensors = executor.map(self._preprocess_bytes, images_bytes)
+            while batch := list(islice(tensors, self.ENCODE_BATCH_SIZE)):
+                image_input = torch.stack(batch)
+                if pin_memory:
+                    image_input = image_input.pin_memory()
+                image_input = image_input.to(self.device, non_blocking=pin_memory)
+                with torch.inference_mode():
+                    image_features = self._run_image_tower(image_input)
+                embeddings.extend(image_features.float().cpu().numpy().tolist())
+        return embeddings
 
     def describe_image(self, image_bytes):
         # Zero-shot description using CLIP and prompt engineering
         # This is a placeholder for a more advanced Gemini-powered description
         # In production, this should call Gemini with a prompt including CLIP's top matches
-        labels = [
-            "a photo of a shoe",
-            "a photo of a handbag",
-            "a photo of a dress",
-            "a photo of a shirt",
-            "a photo of a jacket",
-            "a photo of a watch",
-            "a photo of a hat",
-            "a photo of a pair of pants",
-            "a photo of a pair of sunglasses",
-            "a photo of a wallet",
-            "a photo of a belt",
-            "a photo of a scarf",
-            "a photo of a ring",
-            "a photo of a necklace",
-            "a photo of a bracelet",
-            "a photo of a pair of earrings",
-            "a photo of a t-shirt",
-            "a photo of a coat",
-            "a photo of a skirt",
-            "a photo of a sweater",
-        ]
-        image = Image.open(io.BytesIO(image_bytes)).convert("RGB")
-        image_input = self.preprocess(image).unsqueeze(0).to(self.device)
-        text_inputs = clip.tokenize(labels).to(self.device)
-        with torch.no_grad():
-            image_features = self.model.encode_image(image_input)
-            text_features = self.model.encode_text(text_inputs)
-            logits_per_image, _ = self.model(image_input, text_inputs)
-            probs = logits_per_image.softmax(dim=1).cpu().numpy()[0]
-        best_idx = int(probs.argmax())
+        self._ensure_model_loaded()
+        return self.describe_features(self._encode_features(image_bytes))
+
+    def describe_features(self, image_features):
+        # Zero-shot description from already computed image features (a tensor, or the
+        # list encode_image returns), so callers that need both skip a second forward pass
+        self._ensure_model_loaded()
+        labels = self.LABELS
+        image_features = torch.as_tensor(
+            image_features, dtype=self._label_logit_weights.dtype, device=self.device
+        ).reshape(1, -1)
+        with torch.inference_mode():
+            image_features = image_features / image_features.norm(dim=-1, keepdim=True)
+            # Same logits the full model forward produces, against the cached label embeddings
+            logits_per_image = image_features @ self._label_logit_weights
+            probs = logits_per_image.float().softmax(dim=1).cpu().numpy()[0]
+        # Stable descending order keeps ties in label order, so the first entry is also the argmax
+        top_indices = (-probs).argsort(kind="stable")[:5].tolist()
+        best_idx = top_indices[0]
         best_label = labels[best_idx]
         confidence = float(probs[best_idx])
         return {
             "description": best_label,
             "confidence": confidence,
             "top_labels": [
-                {"label": label, "confidence": float(prob)}
-                for label, prob in sorted(zip(labels, probs), key=lambda x: -x[1])[:5]
+                {"label": labels[idx], "confidence": float(probs[idx])}
+                for idx in top_indices
             ],
         }
 
@@ -77,6 +199,14 @@ class AdvancedImageEncoder:
     def encode(self, image_bytes):
         return self.clip_encoder.encode_image(image_bytes)
 
+    def encode_batch(self, images_bytes):
+        return self.clip_encoder.encode_images(images_bytes)
+
+    def encode_and_describe(self, image_bytes):
+        # One image forward pass serves both the embedding and the description
+        embedding = self.clip_encoder.encode_image(image_bytes)
+        return embedding, self.clip_encoder.describe_features(embedding)
+
     def describe(self, image_bytes):
         # In production, this should call Gemini with a prompt that fuses CLIP, Google Vision, AWS Rekognition, etc.
         # For now, use CLIP zero-shot as a placeholder
@@ -7,24 +7,26 @@ from dotenv import load_dotenv
 
 logger = logging.getLogger(__name__)
 
+# Look for .env in the project root (one level up from `backend`), then in the
+# conventional location next to manage.py; resolved once at import
+_CORE_DIR = Path(__file__).resolve().parent
+_DOTENV_PATHS = (_CORE_DIR.parent.parent / '.env', _CORE_DIR.parent / '.env')
+_environment_loaded = False
+
 def load_environment_variables():
     """
     Load environment variables from a .env file.
     Searches for the .env file in the current directory and the parent directory.
+    Only the first call does any work; later calls return immediately.
     """
-    # Look for .env in the project root (one level up from `backend/core`)
-    project_root = Path(__file__).resolve().parent.parent.parent
-    dotenv_path_root = project_root / '.env'
-
-    # Also check the conventional location relative to manage.py
-    backend_root = Path(__file__).resolve().parent.parent
-    dotenv_path_backend = backend_root / '.env'
+    global _environment_loaded
+    if _environment_loaded:
+        return
+    _environment_loaded = True
 
-    if dotenv_path_root.exists():
-        load_dotenv(dotenv_path=dotenv_path_root)
-        logger.info(f"✅ Loaded environment variables from: {dotenv_path_root}")
-    elif dotenv_path_backend.exists():
-        load_dotenv(dotenv_path=dotenv_path_backend)
-        logger.info(f"✅ Loaded environment variables from: {dotenv_path_backend}")
-    else:
-        logger.warning(f".env file not found. Searched in {dotenv_path_root} and {dotenv_path_backend}.")
+    for dotenv_path in _DOTENV_PATHS:
+        if dotenv_path.exists():
+            load_dotenv(dotenv_path=dotenv_path)
+            logger.info(f"✅ Loaded environment variables from: {dotenv_path}")
+            return
+    logger.warning(f".env file not found. Searched in {_DOTENV_PATHS[0]} and {_DOTENV_PATHS[1]}.")
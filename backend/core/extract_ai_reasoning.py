@@ -1,6 +1,11 @@
+import logging
+import mmap
+import os
 import re
 from pathlib import Path
 
+logger = logging.getLogger(__name__)
+
 LOG_PATH = Path(__file__).parent.parent / 'backend' / 'debug.log'
 
 # Patterns to match
@@ -10,28 +15,49 @@ PROMPT_PATTERNS = [
     ('Gemini Raw Response', re.compile(r'Gemini Raw Response: (.+)', re.DOTALL)),
 ]
 
-# Read the log file
-with open(LOG_PATH, 'r', encoding='utf-8', errors='ignore') as f:
-    lines = f.readlines()
 
-results = {label: None for label, _ in PROMPT_PATTERNS}
+def find_last_matches(path, patterns):
+    """
+    Find the most recent match of each pattern, searching the memory-mapped
+    log backwards from its end so nothing before the matches is read.
+    """
+    results = {label: None for label, _ in patterns}
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return results
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for label, pattern in patterns:
+                # Every pattern starts with its label followed by ': '
+                marker = f'{label}: '.encode()
+                end = len(mm)
+                while (index := mm.rfind(marker, 0, end)) != -1:
+                    start = mm.rfind(b'\n', 0, index) + 1
+                    stop = mm.find(b'\n', index)
+                    stop = len(mm) if stop == -1 else stop + 1
+                    line = mm[start:stop].decode('utf-8', errors='ignore')
+                    if line.endswith('\r\n'):
+                        line = line[:-2] + '\n'
+                    m = pattern.search(line)
+                    if m:
+                        results[label] = m.group(1)
+                        break
+                    end = start
+    return results
 
-# Search backwards for the most recent occurrence of each pattern
-for line in reversed(lines):
-    for label, pattern in PROMPT_PATTERNS:
-        if results[label] is None:
-            m = pattern.search(line)
-            if m:
-                results[label] = m.group(1)
 
-# Print results
-found = False
-import logging
-logger = logging.getLogger(__name__)
-for label in results:
-    if results[label]:
-        logger.info(f"\n==== {label} ====")
-        logger.info(results[label])
-        found = True
-if not found:
-    logger.warning("No Vertex AI or Gemini prompts/responses found in the log.")
\ No newline at end of file
+def main():
+    results = find_last_matches(LOG_PATH, PROMPT_PATTERNS)
+
+    # Print results
+    found = False
+    for label in results:
+        if results[label]:
+            logger.info(f"\n==== {label} ====")
+            logger.info(results[label])
+            found = True
+    if not found:
+        logger.warning("No Vertex AI or Gemini prompts/responses found in the log.")
+
+
+if __name__ == '__main__':
+    main()
@@ -98,20 +98,21 @@ class MarketAnalysisService:
         analysis = {'by_condition': {}}
         for condition, items in comps_by_condition.items():
             if len(items) < 3: continue
-            prices = [item['price'] for item in items]
+            prices = np.array([item['price'] for item in items], dtype=float)
             
-            Q1, Q3 = np.percentile(prices, 25), np.percentile(prices, 75)
+            Q1, Q3 = np.percentile(prices, [25, 75])
             IQR = Q3 - Q1
-            inliers_data = [item for item in items if (Q1 - 1.5 * IQR) <= item['price'] <= (Q3 + 1.5 * IQR)]
-            if not inliers_data: continue
+            inlier_mask = ((Q1 - 1.5 * IQR) <= prices) & (prices <= (Q3 + 1.5 * IQR))
+            if not inlier_mask.any(): continue
             
-            inlier_prices = [item['price'] for item in inliers_data]
+            inlier_prices = prices[inlier_mask]
             # Assumes visual_similarity_score is added in a previous step
-            inlier_weights = [(item['comp'].get('visual_similarity_score', 0.5)**2) + 0.01 for item in inliers_data]
+            similarity_scores = np.array([item['comp'].get('visual_similarity_score', 0.5) for item in items], dtype=float)
+            inlier_weights = similarity_scores[inlier_mask] ** 2 + 0.01
 
             analysis['by_condition'][condition] = {
-                'num_comps': len(inlier_prices),
-                'price_range': (min(inlier_prices), max(inlier_prices)),
+                'num_comps': int(inlier_mask.sum()),
+                'price_range': (float(inlier_prices.min()), float(inlier_prices.max())),
                 'weighted_mean_price': round(np.average(inlier_prices, weights=inlier_weights), 2),
                 'std_dev': round(np.std(inlier_prices), 2),
             }
@@ -1,36 +1,50 @@
 # Stub implementations for missing dependencies
 
+# Messages returned by every unavailable feature, keyed by feature
+_UNAVAILABLE_MESSAGES = {
+    'ebay_listing': "eBay listing functionality not available - celery not installed",
+    'market_analysis_task': "Market analysis functionality not available - celery not installed",
+    'ai_services': "AI services not available - dependencies not installed",
+    'ebay_services': "eBay services not available - dependencies not installed",
+    'ebay_token_info': "eBay token info not available - dependencies not installed",
+    'market_analysis': "Market analysis not available - dependencies not installed",
+}
+
+def _unavailable(feature):
+    # A fresh dict per call, since callers may add to the response before returning it
+    return {"status": "error", "message": _UNAVAILABLE_MESSAGES[feature]}
+
 # Stub for tasks.py
 def create_ebay_listing(*args, **kwargs):
-    return {"status": "error", "message": "eBay listing functionality not available - celery not installed"}
+    return _unavailable('ebay_listing')
 
 def perform_market_analysis(*args, **kwargs):
-    return {"status": "error", "message": "Market analysis functionality not available - celery not installed"}
+    return _unavailable('market_analysis_task')
 
-# Stub for ai_service.py  
+# Stub for ai_service.py
 def get_ai_service():
     return None
 
 class MockAIService:
     def analyze_image(self, *args, **kwargs):
-        return {"status": "error", "message": "AI services not available - dependencies not installed"}
-    
+        return _unavailable('ai_services')
+
     def search_similar(self, *args, **kwargs):
-        return {"status": "error", "message": "AI services not available - dependencies not installed"}
+        return _unavailable('ai_services')
 
 # Stub for services.py
 class _EbayService:
     def __init__(self):
         pass
-        
+
     def search(self, *args, **kwargs):
-        return {"status": "error", "message": "eBay services not available - dependencies not installed"}
-        
+        return _unavailable('ebay_services')
+
     def search_items(self, query, category_ids=None, limit=20, **kwargs):
-        return {"status": "error", "message": "eBay services not available - dependencies not installed"}
-        
+        return _unavailable('ebay_services')
+
     def get_token_info(self):
-        return {"status": "error", "message": "eBay token info not available - dependencies not installed"}
+        return _unavailable('ebay_token_info')
 
 # Stub for market_analysis_service.py
 def get_market_analysis_service():
@@ -38,7 +52,7 @@ def get_market_analysis_service():
 
 class MockMarketAnalysisService:
     def analyze(self, *args, **kwargs):
-        return {"status": "error", "message": "Market analysis not available - dependencies not installed"}
-    
+        return _unavailable('market_analysis')
+
     def run_ai_statistical_analysis(self, *args, **kwargs):
-        return {"error": "Market analysis not available - dependencies not installed"}
\ No newline at end of file
+        return {"error": _UNAVAILABLE_MESSAGES['market_analysis']}
\ No newline at end of file
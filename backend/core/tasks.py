@@ -3,6 +3,7 @@
 import requests
 import json
 import math
+import re
 from decimal import Decimal
 from celery import shared_task
 from django.conf import settings
@@ -17,6 +18,17 @@ from django.core.mail import send_mail
 
 logger = logging.getLogger(__name__)
 
+# (title keywords, peak months, low months, peak multiplier, low multiplier), checked in order
+_SEASONAL_ITEMS = tuple(
+    (re.compile('|'.join(map(re.escape, words))), frozenset(peak_months), frozenset(low_months), peak, low)
+    for words, peak_months, low_months, peak, low in (
+        (['coat', 'jacket', 'boot', 'sweater', 'hoodie', 'winter', 'snow'], [12, 1, 2], [6, 7, 8], 1.25, 0.75),
+        (['shorts', 't-shirt', 'tank', 'swimsuit', 'summer', 'beach'], [6, 7, 8], [12, 1, 2], 1.25, 0.75),
+        (['iphone', 'samsung', 'laptop', 'computer', 'gaming', 'console'], [11, 12], [1, 2], 1.15, 0.85),
+        (['equipment', 'gear', 'uniform', 'jersey', 'athletic', 'sport'], [3, 4, 5, 9, 10], [], 1.1, 0.9),
+    )
+)
+
 def get_ebay_oauth_token():
     """Get eBay OAuth token for API access with automatic refresh"""
     try:
@@ -210,19 +222,12 @@ def calculate_seasonal_multiplier(sale_date, title):
     month = sale_date.month
     title_lower = title.lower()
 
-    seasonal_items = {
-        'winter': (['coat', 'jacket', 'boot', 'sweater', 'hoodie', 'winter', 'snow'], [12, 1, 2], [6, 7, 8]),
-        'summer': (['shorts', 't-shirt', 'tank', 'swimsuit', 'summer', 'beach'], [6, 7, 8], [12, 1, 2]),
-        'electronics': (['iphone', 'samsung', 'laptop', 'computer', 'gaming', 'console'], [11, 12], [1, 2]),
-        'sports': (['equipment', 'gear', 'uniform', 'jersey', 'athletic', 'sport'], [3, 4, 5, 9, 10], [])
-    }
-
-    for category, (words, peak_months, low_months) in seasonal_items.items():
-        if any(word in title_lower for word in words):
+    for words_re, peak_months, low_months, peak, low in _SEASONAL_ITEMS:
+        if words_re.search(title_lower):
             if month in peak_months:
-                return 1.25 if category in ['winter', 'summer'] else 1.15 if category == 'electronics' else 1.1
+                return peak
             elif month in low_months:
-                return 0.75 if category in ['winter', 'summer'] else 0.85 if category == 'electronics' else 0.9
+                return low
 
     return 1.1 if month in [11, 12] else 0.9 if month in [1, 2] else 1.0
 
@@ -1,3 +1,56 @@
-from django.test import TestCase
+import base64
+import json
+import os
+import re
+import tempfile
+import time
 
-# Create your tests here.
+from django.test import SimpleTestCase
+
+from core.extract_ai_reasoning import find_last_matches
+from core.utils import jwt_expires_in
+
+
+def _make_jwt(claims):
+    """Build an unsigned JWT carrying the given claims"""
+    def encode(part):
+        return base64.urlsafe_b64encode(json.dumps(part).encode()).rstrip(b'=').decode()
+    return f"{encode({'alg': 'none', 'typ': 'JWT'})}.{encode(claims)}.signature"
+
+
+class JwtExpiresInTests(SimpleTestCase):
+    def test_valid_token_returns_remaining_seconds(self):
+        token = _make_jwt({'exp': time.time() + 3600})
+        self.assertTrue(3590 <= jwt_expires_in(token) <= 3600)
+
+    def test_expired_token_returns_none(self):
+        self.assertIsNone(jwt_expires_in(_make_jwt({'exp': time.time() - 10})))
+
+    def test_ebay_user_token_is_not_a_jwt(self):
+        self.assertIsNone(jwt_expires_in('v^1.1#i^1#p^3#r^1#I^3#f^0#t^H4sIAAAAAAAAAOVYa2wUVRTe7bZFpAUTVBAfrEOJQrO7M7NvO24g2212hdLa'))
+
+    def test_non_numeric_exp_returns_none(self):
+        self.assertIsNone(jwt_expires_in(_make_jwt({'exp': 'tomorrow'})))
+
+
+class FindLastMatchesTests(SimpleTestCase):
+    PATTERNS = [('Gemini Prompt', re.compile(r'Gemini Prompt: (\d+)'))]
+
+    def _write_log(self, content):
+        fd, path = tempfile.mkstemp(suffix='.log')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_empty_log_returns_no_matches(self):
+        path = self._write_log(b'')
+        self.assertEqual(find_last_matches(path, self.PATTERNS), {'Gemini Prompt': None})
+
+    def test_skips_last_marker_line_that_does_not_match(self):
+        path = self._write_log(
+            b'INFO Gemini Prompt: 1\n'
+            b'INFO Gemini Prompt: 2\r\n'
+            b'INFO Gemini Prompt: not a number\n'
+        )
+        self.assertEqual(find_last_matches(path, self.PATTERNS), {'Gemini Prompt': '2'})
@@ -0,0 +1,52 @@
+"""
+Shared helpers for the core services.
+"""
+import base64
+import json
+import time
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+def build_http_session(pool_maxsize: int = 32) -> requests.Session:
+    """
+    Create a requests session that keeps connections alive between calls.
+
+    Retries cover transient gateway errors on idempotent requests only, so a
+    token refresh POST is never sent twice.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=pool_maxsize,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.2,
+            status_forcelist=(502, 503, 504),
+            raise_on_status=False,
+        ),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def jwt_expires_in(token: str) -> Optional[int]:
+    """
+    Seconds until a JWT's exp claim, or None when the token is not a JWT,
+    carries no exp claim, or has already expired.
+    """
+    try:
+        payload = token.split('.')[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+        remaining = int(claims['exp'] - time.time())
+    except (AttributeError, IndexError, KeyError, TypeError, ValueError):
+        return None
+    return remaining if remaining > 0 else None
+
+
+# Process-wide session so outbound calls reuse pooled TCP/TLS connections
+http_session = build_http_session()
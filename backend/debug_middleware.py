@@ -10,17 +10,17 @@ class DebugMiddleware:
 
     def __call__(self, request):
         # Log request details
-        start_time = time.time()
+        start_time = time.perf_counter()
         logger.info(f"Request: {request.method} {request.path} from {request.META.get('REMOTE_ADDR', 'unknown')}")
         logger.info(f"Headers: {dict(request.headers)}")
         
         try:
             response = self.get_response(request)
-            duration = time.time() - start_time
+            duration = time.perf_counter() - start_time
             logger.info(f"Response: {response.status_code} in {duration:.3f}s")
             return response
         except Exception as e:
-            duration = time.time() - start_time
+            duration = time.perf_counter() - start_time
             logger.error(f"Request failed after {duration:.3f}s: {e}")
             return JsonResponse({
                 "error": "Internal server error",
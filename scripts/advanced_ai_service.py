@@ -14,7 +14,9 @@ from typing import List, Dict, Any, Optional, Tuple, Union
 from collections import defaultdict, Counter
 from datetime import datetime
 import hashlib
+import heapq
 import base64
+from operator import itemgetter
 
 # Google Cloud imports
 from google.cloud import vision
@@ -47,6 +49,18 @@ from core.credential_manager import credential_manager
 
 logger = logging.getLogger(__name__)
 
+
+def _weighted_average(scores: Dict[str, float], weights: Dict[str, float], default_weight: float = 0.1) -> float:
+    """Weighted mean of named scores; names missing from the table get the default weight"""
+    weighted_sum = 0.0
+    total_weight = 0.0
+    for key, score in scores.items():
+        weight = weights.get(key, default_weight)
+        weighted_sum += score * weight
+        total_weight += weight
+    return weighted_sum / total_weight
+
+
 class AdvancedAIService:
     """
     Sophisticated AI-driven image recognition service using multiple neural networks
@@ -398,12 +412,10 @@ class AdvancedAIService:
                         'confidence': torch.sigmoid(similarity * 10).item()  # Scale to 0-1
                     })
             
-            # Sort by confidence
-            category_scores.sort(key=lambda x: x['confidence'], reverse=True)
-            
             return {
                 'image_embeddings': image_features.numpy().tolist(),
-                'semantic_categories': category_scores[:10],  # Top 10
+                # Top 10 by confidence; nlargest keeps sorted()'s tie order without sorting every category
+                'semantic_categories': heapq.nlargest(10, category_scores, key=itemgetter('confidence')),
                 'embedding_dimension': image_features.shape[-1]
             }
             
@@ -881,6 +893,9 @@ class AdvancedAIService:
 class NeuralReasoner:
     """Neural reasoning component for synthesizing multi-modal information"""
     
+    # Weight Google Vision higher (it's usually more accurate)
+    _MODEL_CONFIDENCE_WEIGHTS = {'google_confidence': 0.5, 'aws_confidence': 0.3, 'clip_confidence': 0.2}
+    
     async def reason(self, visual_results: Dict[str, Any], semantic_results: Dict[str, Any]) -> Dict[str, Any]:
         """Apply neural reasoning to synthesize information from multiple sources"""
         reasoning = {
@@ -950,21 +965,7 @@ class NeuralReasoner:
         
         # Overall fused confidence using weighted average
         if fused_scores:
-            # Weight Google Vision higher (it's usually more accurate)
-            weights = {'google_confidence': 0.5, 'aws_confidence': 0.3, 'clip_confidence': 0.2}
-            
-            weighted_sum = 0.0
-            total_weight = 0.0
-            
-            for key, confidence in fused_scores.items():
-                weight = weights.get(key, 0.1)
-                weighted_sum += confidence * weight
-                total_weight += weight
-            
-            if total_weight > 0:
-                fused_scores['overall_confidence'] = weighted_sum / total_weight
-            else:
-                fused_scores['overall_confidence'] = np.mean(list(fused_scores.values()))
+            fused_scores['overall_confidence'] = _weighted_average(fused_scores, self._MODEL_CONFIDENCE_WEIGHTS)
         
         return fused_scores
     
@@ -1101,6 +1102,13 @@ class NeuralReasoner:
 class MultimodalFusion:
     """Multimodal fusion component for combining different types of AI analysis"""
     
+    _MODEL_CONFIDENCE_WEIGHTS = {
+        'google_confidence': 0.4,
+        'aws_confidence': 0.2,
+        'clip_confidence': 0.2,
+        'semantic_confidence': 0.2
+    }
+    
     async def fuse(self, visual_results: Dict[str, Any], 
                   semantic_results: Dict[str, Any], 
                   reasoning_results: Dict[str, Any]) -> Dict[str, Any]:
@@ -1190,25 +1198,9 @@ class MultimodalFusion:
             confidence_scores['semantic_confidence'] = semantic_results['confidence']
         
         # Calculate overall confidence using weighted average
-        model_weights = {
-            'google_confidence': 0.4,
-            'aws_confidence': 0.2,
-            'clip_confidence': 0.2,
-            'semantic_confidence': 0.2
-        }
-        
-        weighted_sum = 0.0
-        total_weight = 0.0
-        
-        for conf_key, confidence in confidence_scores.items():
-            weight = model_weights.get(conf_key, 0.1)
-            weighted_sum += confidence * weight
-            total_weight += weight
-        
-        if total_weight > 0:
-            confidence_scores['overall_confidence'] = weighted_sum / total_weight
-        else:
-            confidence_scores['overall_confidence'] = 0.5
+        confidence_scores['overall_confidence'] = (
+            _weighted_average(confidence_scores, self._MODEL_CONFIDENCE_WEIGHTS) if confidence_scores else 0.5
+        )
         
         return confidence_scores
     
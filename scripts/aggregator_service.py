@@ -16,6 +16,31 @@ import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Color names in get_color_names condition order; the trailing None is the no-match default
+_COLOR_NAMES = np.array(["Red", "Green", "Blue", "Yellow", "Magenta", "Cyan", "White", "Black", "Gray", None], dtype=object)
+
+
+def get_color_names(rgb: np.ndarray) -> np.ndarray:
+    """Simple color name mapping for an (N, 3) array of RGB values."""
+    r, g, b = np.asarray(rgb, dtype=float).reshape(-1, 3).T
+    high_r, high_g, high_b = r > 200, g > 200, b > 200
+    low_r, low_g, low_b = r < 100, g < 100, b < 100
+    # Same precedence as the original if/elif chain
+    conditions = [
+        high_r & low_g & low_b,                  # Red
+        low_r & high_g & low_b,                  # Green
+        low_r & low_g & high_b,                  # Blue
+        high_r & high_g & low_b,                 # Yellow
+        high_r & low_g & high_b,                 # Magenta
+        low_r & high_g & high_b,                 # Cyan
+        high_r & high_g & high_b,                # White
+        (r < 50) & (g < 50) & (b < 50),          # Black
+        (r > 150) & (g > 150) & (b > 150),       # Gray
+    ]
+    indices = np.select(conditions, list(range(len(conditions))), default=len(conditions))
+    return _COLOR_NAMES[indices]
+
+
 class AggregatorService:
     """
     Multi-expert AI service that coordinates Google Vision, Amazon Rekognition, and Google Gemini.
@@ -398,14 +423,14 @@ You are a world-class AI expert for fashion resale and product identification. Y
         # Extract colors
         colors = []
         if google_data.get('success') and google_data.get('dominant_colors'):
-            for color_info in google_data['dominant_colors'][:3]:
-                color = color_info.get('color', {})
-                if color:
-                    # Simple color name mapping
-                    r, g, b = color.get('red', 0), color.get('green', 0), color.get('blue', 0)
-                    color_name = self._get_color_name(r, g, b)
-                    if color_name:
-                        colors.append(color_name)
+            palette = [
+                (color.get('red', 0), color.get('green', 0), color.get('blue', 0))
+                for color in (color_info.get('color', {}) for color_info in google_data['dominant_colors'][:3])
+                if color
+            ]
+            if palette:
+                # Simple color name mapping, classified for the whole palette at once
+                colors = [name for name in get_color_names(palette) if name]
         
         # Calculate confidence
         confidence = 0.5  # Base confidence
@@ -432,27 +457,7 @@ You are a world-class AI expert for fashion resale and product identification. Y
 
     def _get_color_name(self, r: int, g: int, b: int) -> Optional[str]:
         """Simple color name mapping."""
-        # Basic color detection
-        if r > 200 and g < 100 and b < 100:
-            return "Red"
-        elif r < 100 and g > 200 and b < 100:
-            return "Green"
-        elif r < 100 and g < 100 and b > 200:
-            return "Blue"
-        elif r > 200 and g > 200 and b < 100:
-            return "Yellow"
-        elif r > 200 and g < 100 and b > 200:
-            return "Magenta"
-        elif r < 100 and g > 200 and b > 200:
-            return "Cyan"
-        elif r > 200 and g > 200 and b > 200:
-            return "White"
-        elif r < 50 and g < 50 and b < 50:
-            return "Black"
-        elif r > 150 and g > 150 and b > 150:
-            return "Gray"
-        else:
-            return None
+        return get_color_names([(r, g, b)])[0]
 
 def get_aggregator_service():
     """Global getter for easy, safe access to the service instance."""
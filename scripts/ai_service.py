@@ -25,15 +25,67 @@ from collections import defaultdict, Counter
 import math
 import hashlib
 import pickle
+from operator import itemgetter
 from datetime import datetime, timedelta, timezone
 import boto3
 from core.credential_manager import credential_manager
+from .aggregator_service import get_color_names
 
 logger = logging.getLogger(__name__)
 
+# Strips everything but ASCII letters from OCR tokens
+_NON_ALPHA_RE = re.compile(r'[^a-zA-Z]')
+
+# Four-digit years from 1900-2099 in OCR text
+_YEAR_RE = re.compile(r'\b(?:19|20)\d{2}\b')
+
+# OCR words that suggest an event or limited release
+_EVENT_INDICATORS = frozenset({'championship', 'season', 'edition', 'limited', 'vintage', 'retro'})
+
+# Dominant colors that describe backgrounds or lighting rather than the item
+_GENERIC_COLOR_NAMES = frozenset({'white', 'black', 'gray', 'grey', 'light', 'dark', 'neutral'})
+
+# Words that mark a term as brand context when they appear anywhere in it
+_BRAND_INDICATOR_RE = re.compile(r'brand|label|logo|designer|fashion|luxury')
+
+# Term-shape heuristics, one alternation per category so each check is a single match()
+_PRODUCT_PATTERN_RE = re.compile(
+    r'(?:'
+    r'.*wear|.*ing|.*el'    # footwear, clothing, apparel
+    r'|[a-z]{4,10}'         # single word, moderate length
+    r'|.*top|.*bottom'      # tank top, etc.
+    r')$'
+)
+_STYLE_PATTERN_RE = re.compile(
+    r'(?:'
+    r'.*ly|.*ive|.*ic'      # casually, active, classic
+    r'|.*style|.*wear'      # lifestyle, streetwear
+    r')$'
+)
+_MATERIAL_PATTERN_RE = re.compile(
+    r'(?:'
+    r'.*ber|.*ton|.*el|.*ic'  # fiber, cotton, steel, plastic
+    r'|.*silk|.*wool'         # fabric indicators
+    r')$'
+)
+
 class AIService:
     """Service for AI-powered image analysis using Google Cloud Vision with Advanced ML"""
     
+    # Semantic queries for CLIP analysis
+    SEMANTIC_QUERIES = (
+        "clothing apparel",
+        "fashion item",
+        "wearable product",
+        "style accessory"
+    )
+    
+    # Product type assumed by the fallback search path
+    DEFAULT_PRODUCT_TYPE = 'clothing'
+    
+    # Entries kept in the per-instance _categorize_term cache before it is reset
+    TERM_CACHE_SIZE = 4096
+    
     def __init__(self):
         logger.info("AIService __init__ called")
         # Lazy initialization - don't initialize clients until needed
@@ -59,6 +111,9 @@ class AIService:
         # Advanced AI components
         self.entity_embeddings = {}
         self.semantic_similarity_cache = {}
+        # _categorize_term results, valid for the sentence transformer they were computed with
+        self._term_categories = {}
+        self._term_categories_model = None
         self.confidence_models = {}
         self.attention_weights = {}
         self.learning_history = []
@@ -436,10 +491,8 @@ class AIService:
                 image_features = image_features / image_features.norm(dim=-1, keepdim=True)
             
             # Generate semantic queries based on visual understanding
-            semantic_queries = self._generate_semantic_queries(image_features)
-            
-            # Rank queries by semantic similarity
-            ranked_queries = self._rank_semantic_queries(semantic_queries, image_features)
+            # Rank the semantic queries by similarity to the image
+            ranked_queries = self._rank_semantic_queries(self.SEMANTIC_QUERIES, image_features)
             
             # Extract search terms from top queries
             search_terms = []
@@ -447,10 +500,13 @@ class AIService:
                 terms = query.split()
                 search_terms.extend(terms)
             
-            # Remove duplicates while preserving order
+            # Remove case-insensitive duplicates while preserving order
             unique_terms = []
+            seen_terms = set()
             for term in search_terms:
-                if term.lower() not in [t.lower() for t in unique_terms]:
+                term_key = term.lower()
+                if term_key not in seen_terms:
+                    seen_terms.add(term_key)
                     unique_terms.append(term)
             
             # Best guess is the most semantically relevant term
@@ -459,9 +515,9 @@ class AIService:
             # Generate suggested queries
             suggested_queries = ranked_queries[:5]  # Top 5 semantic queries
             
-            logger.info(f"[CLIP SEARCH] Semantic search terms: {unique_terms}")
-            logger.info(f"[CLIP SEARCH] Best guess: {best_guess}")
-            logger.info(f"[CLIP SEARCH] Suggested queries: {suggested_queries}")
+            logger.info("[CLIP SEARCH] Semantic search terms: %s", unique_terms)
+            logger.info("[CLIP SEARCH] Best guess: %s", best_guess)
+            logger.info("[CLIP SEARCH] Suggested queries: %s", suggested_queries)
             
             return unique_terms, best_guess, suggested_queries
             
@@ -476,30 +532,27 @@ class AIService:
         try:
             import torch
             
-            ranked_queries = []
+            if not queries:
+                return []
             
-            for query in queries:
-                # Encode query text
-                text_tokens = self.clip_tokenizer([query])
-                with torch.no_grad():
-                    text_features = self.clip_model.encode_text(text_tokens)
-                    text_features = text_features / text_features.norm(dim=-1, keepdim=True)
-                
-                # Calculate similarity
-                similarity = torch.cosine_similarity(image_features, text_features)
-                similarity_score = similarity.item()
+            # Encode every query in one batch
+            text_tokens = self.clip_tokenizer(list(queries))
+            with torch.no_grad():
+                text_features = self.clip_model.encode_text(text_tokens)
+                text_features = text_features / text_features.norm(dim=-1, keepdim=True)
                 
-                ranked_queries.append((query, similarity_score))
+                # Both sides are L2-normalized, so one matmul gives every cosine similarity
+                similarity_scores = (image_features @ text_features.T)[0].tolist()
             
-            # Sort by similarity score
-            ranked_queries.sort(key=lambda x: x[1], reverse=True)
+            # Sort by similarity score; the key is a C-level getter rather than a lambda per comparison
+            ranked_queries = sorted(zip(queries, similarity_scores), key=itemgetter(1), reverse=True)
             
             # Return just the queries (without scores)
             return [query for query, score in ranked_queries]
             
         except Exception as e:
             logger.error(f"[RANK SEMANTIC] Error: {e}")
-            return queries
+            return list(queries)
     
     def _fallback_search_terms(self, analysis_results: Dict[str, Any]) -> Tuple[list, str, list]:
         """
@@ -508,65 +561,42 @@ class AIService:
         # Use the enhanced human-like query builder
         queries = self._intelligent_query_builder_with_attention(analysis_results)
         
-        # Get advanced product type detection
-        product_insights = self._advanced_product_type_detection(analysis_results)
-        
         # Extract search terms from the first query
         search_terms = queries[0].split() if queries else ['item']
         
-        # Add product type if detected with high confidence
-        if product_insights['primary_type'] and product_insights['confidence'] > 0.6:
-            product_type = product_insights['primary_type']
-            if product_type not in search_terms:
-                search_terms.insert(0, product_type)  # Add at beginning for priority
+        # Add the default product type if missing
+        if self.DEFAULT_PRODUCT_TYPE not in search_terms:
+            search_terms.insert(0, self.DEFAULT_PRODUCT_TYPE)  # Add at beginning for priority
         
         # Best guess is the first entity or category
         best_guess = search_terms[0] if search_terms else 'item'
         
-        # Generate suggested queries using human-like patterns
-        suggested_queries = queries[:8]  # Top 8 human-like queries
-        
-        # Add product type to suggested queries if detected
-        if product_insights['primary_type'] and product_insights['confidence'] > 0.5:
-            product_type = product_insights['primary_type']
-            # Create product-specific queries with human-like patterns
-            enhanced_queries = []
-            for query in suggested_queries:
-                if product_type not in query:
-                    enhanced_queries.append(f"{product_type} {query}")
-                else:
-                    enhanced_queries.append(query)
-            suggested_queries = enhanced_queries
-        
-        logger.info(f"[FALLBACK SEARCH] Final search terms: {search_terms}")
-        logger.info(f"[FALLBACK SEARCH] Best guess: {best_guess}")
-        logger.info(f"[FALLBACK SEARCH] Human-like suggested queries: {suggested_queries}")
+        # Generate product-specific suggested queries from the top 8 human-like queries
+        suggested_queries = []
+        for query in queries[:8]:
+            if self.DEFAULT_PRODUCT_TYPE not in query:
+                suggested_queries.append(f"{self.DEFAULT_PRODUCT_TYPE} {query}")
+            else:
+                suggested_queries.append(query)
+        
+        logger.info("[FALLBACK SEARCH] Final search terms: %s", search_terms)
+        logger.info("[FALLBACK SEARCH] Best guess: %s", best_guess)
+        logger.info("[FALLBACK SEARCH] Human-like suggested queries: %s", suggested_queries)
         
         return search_terms, best_guess, suggested_queries
 
     def _intelligent_query_builder_with_attention(self, analysis_results):
         """Build intelligent search queries using attention mechanisms and human-like logic"""
-        # Extract all text sources
-        all_text = analysis_results.get('ocr_text', '')
-        labels = analysis_results.get('labels', [])
-        objects = analysis_results.get('objects', [])
-        web_entities = analysis_results.get('web_entities', [])
-        
-        # Build context vectors
-        context_vectors = self._build_context_vectors(all_text, labels, objects)
-        
         # Advanced entity detection with attention
-        detected_entities = self._advanced_entity_detection_with_attention(all_text, context_vectors)
+        detected_entities = self._advanced_entity_detection_with_attention(analysis_results.get('ocr_text', ''))
         
         # Enhanced human-like query generation
-        queries = self._generate_human_like_structured_queries(analysis_results, detected_entities, context_vectors)
+        queries = self._generate_human_like_structured_queries(analysis_results, detected_entities)
         
         return queries
     
-    def _generate_human_like_structured_queries(self, analysis_results, detected_entities, context_vectors):
+    def _generate_human_like_structured_queries(self, analysis_results, detected_entities):
         """Generate human-like structured queries using advanced AI logic"""
-        queries = []
-        
         # Extract different types of information
         brand_terms = self._extract_brand_entities(detected_entities, analysis_results)
         product_terms = self._extract_product_entities(detected_entities, analysis_results)
@@ -575,255 +605,226 @@ class AIService:
         material_terms = self._extract_material_entities(detected_entities, analysis_results)
         year_event_terms = self._extract_temporal_entities(detected_entities, analysis_results)
         
-        logger.info(f"[QUERY BUILDER] Brand terms: {brand_terms}")
-        logger.info(f"[QUERY BUILDER] Product terms: {product_terms}")
-        logger.info(f"[QUERY BUILDER] Color terms: {color_terms}")
-        logger.info(f"[QUERY BUILDER] Style terms: {style_terms}")
-        logger.info(f"[QUERY BUILDER] Material terms: {material_terms}")
-        logger.info(f"[QUERY BUILDER] Year/Event terms: {year_event_terms}")
-        
-        # Strategy 1: Brand + Product + Attributes (Most Specific)
-        if brand_terms and product_terms:
-            for brand in brand_terms[:2]:
-                for product in product_terms[:2]:
-                    base_query = f"{brand} {product}"
-                    
-                    # Add color if available
-                    if color_terms:
-                        for color in color_terms[:1]:
-                            queries.append(f"{base_query} {color}")
+        logger.info("[QUERY BUILDER] Brand terms: %s", brand_terms)
+        logger.info("[QUERY BUILDER] Product terms: %s", product_terms)
+        logger.info("[QUERY BUILDER] Color terms: %s", color_terms)
+        logger.info("[QUERY BUILDER] Style terms: %s", style_terms)
+        logger.info("[QUERY BUILDER] Material terms: %s", material_terms)
+        logger.info("[QUERY BUILDER] Year/Event terms: %s", year_event_terms)
+        
+        # First term of each attribute type, hoisted out of the strategy loops
+        brand = brand_terms[0] if brand_terms else None
+        product = product_terms[0] if product_terms else None
+        color = color_terms[0] if color_terms else None
+        style = style_terms[0] if style_terms else None
+        material = material_terms[0] if material_terms else None
+        event = year_event_terms[0] if year_event_terms else None
+        
+        # Strategies are evaluated lazily so the cascade stops as soon as
+        # 15 unique queries have been collected below
+        def candidate_queries():
+            # Strategy 1: Brand + Product + Attributes (Most Specific)
+            if brand_terms and product_terms:
+                for brand_term in brand_terms[:2]:
+                    for product_term in product_terms[:2]:
+                        base_query = " ".join((brand_term, product_term))
+                        
+                        # Add color, style, material and year/event if available
+                        if color_terms:
+                            yield " ".join((base_query, color))
+                        if style_terms:
+                            yield " ".join((base_query, style))
+                        if material_terms:
+                            yield " ".join((base_query, material))
+                        if year_event_terms:
+                            yield " ".join((base_query, event))
+                        
+                        # Add color + style and color + material combinations
+                        if color_terms and style_terms:
+                            yield " ".join((base_query, color, style))
+                        if color_terms and material_terms:
+                            yield " ".join((base_query, color, material))
+                        
+                        # Base brand + product query
+                        yield base_query
+            
+            # Strategy 2: Product + Color + Style (Fashion Context)
+            if product_terms and color_terms:
+                for product_term in product_terms[:2]:
+                    base_query = " ".join((product_term, color))
                     
-                    # Add style if available
+                    # Add style, material and style + material if available
                     if style_terms:
-                        for style in style_terms[:1]:
-                            queries.append(f"{base_query} {style}")
-                    
-                    # Add material if available
+                        yield " ".join((base_query, style))
                     if material_terms:
-                        for material in material_terms[:1]:
-                            queries.append(f"{base_query} {material}")
-                    
-                    # Add year/event if available
-                    if year_event_terms:
-                        for event in year_event_terms[:1]:
-                            queries.append(f"{base_query} {event}")
-                    
-                    # Add color + style combination
-                    if color_terms and style_terms:
-                        for color in color_terms[:1]:
-                            for style in style_terms[:1]:
-                                queries.append(f"{base_query} {color} {style}")
-                    
-                    # Add color + material combination
-                    if color_terms and material_terms:
-                        for color in color_terms[:1]:
-                            for material in material_terms[:1]:
-                                queries.append(f"{base_query} {color} {material}")
-                    
-                    # Base brand + product query
-                    queries.append(base_query)
-        
-        # Strategy 2: Product + Color + Style (Fashion Context)
-        if product_terms and color_terms:
-            for product in product_terms[:2]:
-                for color in color_terms[:1]:
-                    base_query = f"{product} {color}"
-                    
-                    # Add style if available
-                    if style_terms:
-                        for style in style_terms[:1]:
-                            queries.append(f"{base_query} {style}")
-                    
-                    # Add material if available
-                    if material_terms:
-                        for material in material_terms[:1]:
-                            queries.append(f"{base_query} {material}")
-                    
-                    # Add style + material combination
+                        yield " ".join((base_query, material))
                     if style_terms and material_terms:
-                        for style in style_terms[:1]:
-                            for material in material_terms[:1]:
-                                queries.append(f"{base_query} {style} {material}")
+                        yield " ".join((base_query, style, material))
                     
                     # Base product + color query
-                    queries.append(base_query)
-        
-        # Strategy 3: Brand + Style + Color (Luxury Context)
-        if brand_terms and style_terms:
-            for brand in brand_terms[:2]:
-                for style in style_terms[:1]:
-                    base_query = f"{brand} {style}"
+                    yield base_query
+            
+            # Strategy 3: Brand + Style + Color (Luxury Context)
+            if brand_terms and style_terms:
+                for brand_term in brand_terms[:2]:
+                    base_query = " ".join((brand_term, style))
                     
-                    # Add color if available
+                    # Add color and material if available
                     if color_terms:
-                        for color in color_terms[:1]:
-                            queries.append(f"{base_query} {color}")
-                    
-                    # Add material if available
+                        yield " ".join((base_query, color))
                     if material_terms:
-                        for material in material_terms[:1]:
-                            queries.append(f"{base_query} {material}")
+                        yield " ".join((base_query, material))
                     
                     # Base brand + style query
-                    queries.append(base_query)
-        
-        # Strategy 4: Year/Event + Product (Collector Context)
-        if year_event_terms and product_terms:
-            for event in year_event_terms[:2]:
-                for product in product_terms[:1]:
-                    base_query = f"{event} {product}"
+                    yield base_query
+            
+            # Strategy 4: Year/Event + Product (Collector Context)
+            if year_event_terms and product_terms:
+                for event_term in year_event_terms[:2]:
+                    base_query = " ".join((event_term, product))
                     
-                    # Add color if available
+                    # Add color and brand if available
                     if color_terms:
-                        for color in color_terms[:1]:
-                            queries.append(f"{base_query} {color}")
-                    
-                    # Add brand if available
+                        yield " ".join((base_query, color))
                     if brand_terms:
-                        for brand in brand_terms[:1]:
-                            queries.append(f"{brand} {base_query}")
+                        yield " ".join((brand, base_query))
                     
                     # Base event + product query
-                    queries.append(base_query)
-        
-        # Strategy 6: Material + Product + Color (Material-Focused)
-        if material_terms and product_terms:
-            for material in material_terms[:1]:
-                for product in product_terms[:1]:
-                    base_query = f"{material} {product}"
-                    
-                    # Add color if available
-                    if color_terms:
-                        for color in color_terms[:1]:
-                            queries.append(f"{base_query} {color}")
-                    
-                    # Add brand if available
-                    if brand_terms:
-                        for brand in brand_terms[:1]:
-                            queries.append(f"{brand} {base_query}")
-                    
-                    # Base material + product query
-                    queries.append(base_query)
-        
-        # Strategy 7: Style + Color + Product (Style-Focused)
-        if style_terms and color_terms:
-            for style in style_terms[:1]:
-                for color in color_terms[:1]:
-                    base_query = f"{style} {color}"
-                    
-                    # Add product if available
-                    if product_terms:
-                        for product in product_terms[:1]:
-                            queries.append(f"{base_query} {product}")
-                    
-                    # Add brand if available
-                    if brand_terms:
-                        for brand in brand_terms[:1]:
-                            queries.append(f"{brand} {base_query}")
-                    
-                    # Base style + color query
-                    queries.append(base_query)
-        
-        # Strategy 8: Brand + Year/Event (Vintage Context)
-        if brand_terms and year_event_terms:
-            for brand in brand_terms[:2]:
-                for event in year_event_terms[:1]:
-                    queries.append(f"{brand} {event}")
-        
-        # Strategy 9: Product + Year/Event (Generic Collector)
-        if product_terms and year_event_terms:
-            for product in product_terms[:1]:
-                for event in year_event_terms[:1]:
-                    queries.append(f"{product} {event}")
-        
-        # Strategy 10: Single high-confidence terms (Fallback)
-        high_confidence_entities = [e for e in detected_entities if e.get('fused_confidence', 0) > 0.8]
-        if high_confidence_entities:
+                    yield base_query
+            
+            # Strategy 6: Material + Product + Color (Material-Focused)
+            if material_terms and product_terms:
+                base_query = " ".join((material, product))
+                
+                # Add color and brand if available
+                if color_terms:
+                    yield " ".join((base_query, color))
+                if brand_terms:
+                    yield " ".join((brand, base_query))
+                
+                # Base material + product query
+                yield base_query
+            
+            # Strategy 7: Style + Color + Product (Style-Focused)
+            if style_terms and color_terms:
+                base_query = " ".join((style, color))
+                
+                # Add product and brand if available
+                if product_terms:
+                    yield " ".join((base_query, product))
+                if brand_terms:
+                    yield " ".join((brand, base_query))
+                
+                # Base style + color query
+                yield base_query
+            
+            # Strategy 8: Brand + Year/Event (Vintage Context)
+            if brand_terms and year_event_terms:
+                for brand_term in brand_terms[:2]:
+                    yield " ".join((brand_term, event))
+            
+            # Strategy 9: Product + Year/Event (Generic Collector)
+            if product_terms and year_event_terms:
+                yield " ".join((product, event))
+            
+            # Strategy 10: Single high-confidence terms (Fallback)
+            high_confidence_entities = [e for e in detected_entities if e.get('fused_confidence', 0) > 0.8]
             for entity in high_confidence_entities[:3]:
-                queries.append(entity['entity'])
-        
-        # Strategy 11: Brand-only queries (Brand recognition)
-        if brand_terms:
-            for brand in brand_terms[:2]:
-                queries.append(brand)
-        
-        # Strategy 12: Product-only queries (Product recognition)
-        if product_terms:
-            for product in product_terms[:2]:
-                queries.append(product)
-        
-        # Remove duplicates while preserving order
-        unique_queries = []
-        for query in queries:
+                yield entity['entity']
+            
+            # Strategy 11: Brand-only queries (Brand recognition)
+            yield from brand_terms[:2]
+            
+            # Strategy 12: Product-only queries (Product recognition)
+            yield from product_terms[:2]
+        
+        # Remove duplicates (ignoring whitespace and case) while preserving order,
+        # limited to top 15 most relevant queries
+        seen = set()
+        final_queries = []
+        for query in candidate_queries():
             clean_query = ' '.join(query.split())  # Normalize whitespace
-            if clean_query and clean_query not in unique_queries:
-                unique_queries.append(clean_query)
-        
-        # Limit to top 15 most relevant queries
-        final_queries = unique_queries[:15]
-        
-        logger.info(f"[QUERY BUILDER] Generated {len(final_queries)} human-like queries")
-        for i, query in enumerate(final_queries[:5]):  # Log first 5 queries
-            logger.info(f"[QUERY BUILDER] Query {i+1}: {query}")
+            key = clean_query.casefold()
+            if clean_query and key not in seen:
+                seen.add(key)
+                final_queries.append(clean_query)
+                if len(final_queries) >= 15:
+                    break
+        
+        logger.info("[QUERY BUILDER] Generated %s human-like queries", len(final_queries))
+        if logger.isEnabledFor(logging.INFO):
+            for i, query in enumerate(final_queries[:5]):  # Log first 5 queries
+                logger.info("[QUERY BUILDER] Query %s: %s", i+1, query)
         
         return final_queries
     
     def _extract_brand_entities(self, detected_entities, analysis_results):
         """Extract brand-related entities using AI detection"""
+        if not detected_entities and not analysis_results.get('ocr_text') and not analysis_results.get('labels'):
+            return []
+        
         brand_terms = []
         
         # Extract from detected entities
         for entity in detected_entities:
-            if entity.get('entity_type') == 'brand' or self._is_likely_brand(entity['entity']):
+            if entity.get('entity_type') == 'brand' or 'brand' in self._categorize_term(entity['entity']):
                 brand_terms.append(entity['entity'])
         
         # Extract from OCR text using AI patterns
         ocr_text = analysis_results.get('ocr_text', '')
         if ocr_text:
             # Look for capitalized words that might be brands
+            seen_brands = {brand.lower() for brand in brand_terms}
             words = ocr_text.split()
             for word in words:
-                clean_word = re.sub(r'[^a-zA-Z]', '', word)
-                if (len(clean_word) > 3 and 
-                    clean_word[0].isupper() and 
+                clean_word = _NON_ALPHA_RE.sub('', word)
+                if (len(clean_word) > 3 and
+                    clean_word[0].isupper() and
                     clean_word.isalpha() and
-                    clean_word.lower() not in [brand.lower() for brand in brand_terms]):
+                    clean_word.lower() not in seen_brands):
+                    seen_brands.add(clean_word.lower())
                     brand_terms.append(clean_word)
         
         # Extract from labels
         for label in analysis_results.get('labels', []):
-            if self._is_likely_brand(label['description']):
+            if 'brand' in self._categorize_term(label['description']):
                 brand_terms.append(label['description'])
         
         return list(set(brand_terms))[:3]  # Remove duplicates, limit to top 3
     
     def _extract_product_entities(self, detected_entities, analysis_results):
         """Extract product-related entities using AI detection"""
+        if not detected_entities and not analysis_results.get('labels') and not analysis_results.get('objects'):
+            return []
+        
         product_terms = []
         
         # Extract from detected entities
         for entity in detected_entities:
-            if entity.get('entity_type') == 'product' or self._is_likely_product(entity['entity']):
+            if entity.get('entity_type') == 'product' or 'product' in self._categorize_term(entity['entity']):
                 product_terms.append(entity['entity'])
         
         # Extract from labels and objects
         for label in analysis_results.get('labels', []):
-            if self._is_likely_product(label['description']):
+            if 'product' in self._categorize_term(label['description']):
                 product_terms.append(label['description'])
         
         for obj in analysis_results.get('objects', []):
-            if self._is_likely_product(obj['name']):
+            if 'product' in self._categorize_term(obj['name']):
                 product_terms.append(obj['name'])
         
         return list(set(product_terms))[:3]
     
     def _extract_color_entities(self, detected_entities, analysis_results):
         """Extract color-related entities using AI detection"""
+        if not detected_entities and not analysis_results.get('dominant_colors') and not analysis_results.get('labels'):
+            return []
+        
         color_terms = []
         
         # Extract from detected entities
         for entity in detected_entities:
-            if entity.get('entity_type') == 'color' or self._is_likely_color(entity['entity']):
+            if entity.get('entity_type') == 'color' or 'color' in self._categorize_term(entity['entity']):
                 color_terms.append(entity['entity'])
         
         # Extract from dominant colors
@@ -835,45 +836,54 @@ class AIService:
         
         # Extract from labels
         for label in analysis_results.get('labels', []):
-            if self._is_likely_color(label['description']):
+            if 'color' in self._categorize_term(label['description']):
                 color_terms.append(label['description'])
         
         return list(set(color_terms))[:2]
     
     def _extract_style_entities(self, detected_entities, analysis_results):
         """Extract style-related entities using AI detection"""
+        if not detected_entities and not analysis_results.get('labels'):
+            return []
+        
         style_terms = []
         
         # Extract from detected entities
         for entity in detected_entities:
-            if entity.get('entity_type') == 'style' or self._is_likely_style(entity['entity']):
+            if entity.get('entity_type') == 'style' or 'style' in self._categorize_term(entity['entity']):
                 style_terms.append(entity['entity'])
         
         # Extract from labels
         for label in analysis_results.get('labels', []):
-            if self._is_likely_style(label['description']):
+            if 'style' in self._categorize_term(label['description']):
                 style_terms.append(label['description'])
         
         return list(set(style_terms))[:2]
     
     def _extract_material_entities(self, detected_entities, analysis_results):
         """Extract material-related entities using AI detection"""
+        if not detected_entities and not analysis_results.get('labels'):
+            return []
+        
         material_terms = []
         
         # Extract from detected entities
         for entity in detected_entities:
-            if entity.get('entity_type') == 'material' or self._is_likely_material(entity['entity']):
+            if entity.get('entity_type') == 'material' or 'material' in self._categorize_term(entity['entity']):
                 material_terms.append(entity['entity'])
         
         # Extract from labels
         for label in analysis_results.get('labels', []):
-            if self._is_likely_material(label['description']):
+            if 'material' in self._categorize_term(label['description']):
                 material_terms.append(label['description'])
         
         return list(set(material_terms))[:2]
     
     def _extract_temporal_entities(self, detected_entities, analysis_results):
         """Extract temporal entities (years, events) using AI detection"""
+        if not detected_entities and not analysis_results.get('ocr_text'):
+            return []
+        
         temporal_terms = []
         
         # Extract from detected entities
@@ -885,36 +895,52 @@ class AIService:
         ocr_text = analysis_results.get('ocr_text', '')
         if ocr_text:
             # Year patterns
-            year_pattern = r'\b(19|20)\d{2}\b'
-            years = re.findall(year_pattern, ocr_text)
-            temporal_terms.extend(years)
+            temporal_terms.extend(_YEAR_RE.findall(ocr_text))
             
             # Event patterns (words that might indicate events)
-            event_indicators = ['championship', 'season', 'edition', 'limited', 'vintage', 'retro']
-            words = ocr_text.lower().split()
-            for word in words:
-                if word in event_indicators:
-                    temporal_terms.append(word)
+            temporal_terms.extend(set(ocr_text.lower().split()) & _EVENT_INDICATORS)
         
         return list(set(temporal_terms))[:2]
     
 
     
-    def _is_likely_brand(self, term):
+    def _categorize_term(self, term):
+        """Classify a term into every attribute category it matches in one pass"""
+        if not term or len(term) < 3:
+            return frozenset()
+        
+        # The semantic detectors depend on the sentence transformer, so a new model starts a fresh cache
+        model = getattr(self, 'sentence_transformer', None)
+        if model is not self._term_categories_model or len(self._term_categories) >= self.TERM_CACHE_SIZE:
+            self._term_categories.clear()
+            self._term_categories_model = model
+        categories = self._term_categories.get(term)
+        if categories is None:
+            categories = self._term_categories[term] = self._detect_term_categories(term)
+        return categories
+    
+    def _detect_term_categories(self, term):
+        """Run every attribute detector over a term"""
+        # Lowercase once and share it across every detector
+        term_lower = term.lower()
+        return frozenset(
+            category for category, is_likely in (
+                ('brand', self._is_likely_brand),
+                ('product', self._is_likely_product),
+                ('color', self._is_likely_color),
+                ('style', self._is_likely_style),
+                ('material', self._is_likely_material),
+            ) if is_likely(term, term_lower)
+        )
+    
+    def _is_likely_brand(self, term, term_lower=None):
         """AI-driven brand detection"""
         if not term or len(term) < 3:
             return False
         
-        # Look for brand indicators
-        term_lower = term.lower()
-        brand_indicators = [
-            'brand', 'label', 'logo', 'designer', 'fashion', 'luxury'
-        ]
-        
         # Check if term appears in brand context
-        for indicator in brand_indicators:
-            if indicator in term_lower:
-                return True
+        if _BRAND_INDICATOR_RE.search(term_lower or term.lower()):
+            return True
         
         # Check for brand-like patterns (capitalized, repeated, etc.)
         if term[0].isupper() and term.isalpha() and len(term) > 3:
@@ -922,33 +948,17 @@ class AIService:
         
         return False
     
-    def _is_likely_product(self, term):
+    def _is_likely_product(self, term, term_lower=None):
         """AI-driven product detection using neural patterns"""
         if not term or len(term) < 3:
             return False
         
-        term_lower = term.lower()
+        term_lower = term_lower or term.lower()
         
         # AI-driven pattern recognition for product terms
         # Look for linguistic patterns that suggest product categories
-        product_patterns = [
-            # Pattern 1: Common product suffixes
-            r'.*wear$',  # footwear, activewear, etc.
-            r'.*ing$',   # clothing, etc.
-            r'.*el$',    # apparel, etc.
-            
-            # Pattern 2: Product-like semantic patterns
-            r'^[a-z]{4,10}$',  # Single word, moderate length
-            
-            # Pattern 3: Compound product terms
-            r'.*top$',   # tank top, etc.
-            r'.*bottom$', # etc.
-        ]
-        
-        # Check for product-like patterns
-        for pattern in product_patterns:
-            if re.match(pattern, term_lower):
-                return True
+        if _PRODUCT_PATTERN_RE.match(term_lower):
+            return True
         
         # Neural pattern: Check for semantic similarity to known product concepts
         if hasattr(self, 'sentence_transformer') and self.sentence_transformer:
@@ -979,29 +989,12 @@ class AIService:
                 term_lower.isalpha() and
                 not term_lower.endswith('ly'))  # Avoid adverbs
     
-    def _is_likely_color(self, term):
+    def _is_likely_color(self, term, term_lower=None):
         """AI-driven color detection using neural patterns"""
         if not term or len(term) < 3:
             return False
         
-        term_lower = term.lower()
-        
-        # AI-driven color pattern recognition
-        color_patterns = [
-            # Pattern 1: Color-like word endings
-            r'.*ish$',    # reddish, blueish, etc.
-            r'.*ed$',     # colored terms
-            
-            # Pattern 2: Specific color indicators (learned patterns)
-            r'^[a-z]{3,8}$',  # Single word, color-typical length
-        ]
-        
-        # Check for color-like patterns
-        for pattern in color_patterns:
-            if re.match(pattern, term_lower):
-                # Additional checks for color-like characteristics
-                if not term_lower.endswith('ed') or len(term_lower) <= 6:
-                    continue
+        term_lower = term_lower or term.lower()
         
         # Neural color detection using semantic similarity
         if hasattr(self, 'sentence_transformer') and self.sentence_transformer:
@@ -1039,29 +1032,16 @@ class AIService:
         
         return False
     
-    def _is_likely_style(self, term):
+    def _is_likely_style(self, term, term_lower=None):
         """AI-driven style detection using neural patterns"""
         if not term or len(term) < 3:
             return False
         
-        term_lower = term.lower()
+        term_lower = term_lower or term.lower()
         
         # AI-driven style pattern recognition
-        style_patterns = [
-            # Pattern 1: Style-like word endings
-            r'.*ly$',     # casually, formally, etc. (but avoid some adverbs)
-            r'.*ive$',    # active, expressive, etc.
-            r'.*ic$',     # classic, athletic, etc.
-            
-            # Pattern 2: Style descriptors
-            r'.*style$',  # freestyle, lifestyle, etc.
-            r'.*wear$',   # streetwear, sportswear, etc.
-        ]
-        
-        # Check for style-like patterns
-        for pattern in style_patterns:
-            if re.match(pattern, term_lower):
-                return True
+        if _STYLE_PATTERN_RE.match(term_lower):
+            return True
         
         # Neural style detection using semantic similarity
         if hasattr(self, 'sentence_transformer') and self.sentence_transformer:
@@ -1099,30 +1079,16 @@ class AIService:
         
         return False
     
-    def _is_likely_material(self, term):
+    def _is_likely_material(self, term, term_lower=None):
         """AI-driven material detection using neural patterns"""
         if not term or len(term) < 3:
             return False
         
-        term_lower = term.lower()
+        term_lower = term_lower or term.lower()
         
         # AI-driven material pattern recognition
-        material_patterns = [
-            # Pattern 1: Material-like word endings
-            r'.*ber$',    # fiber, rubber, etc.
-            r'.*ton$',    # cotton, etc.
-            r'.*el$',     # steel, etc.
-            r'.*ic$',     # plastic, etc.
-            
-            # Pattern 2: Fabric indicators
-            r'.*silk$',
-            r'.*wool$',
-        ]
-        
-        # Check for material-like patterns
-        for pattern in material_patterns:
-            if re.match(pattern, term_lower):
-                return True
+        if _MATERIAL_PATTERN_RE.match(term_lower):
+            return True
         
         # Neural material detection using semantic similarity
         if hasattr(self, 'sentence_transformer') and self.sentence_transformer:
@@ -1244,36 +1210,20 @@ class AIService:
         """Initialize advanced AI components"""
         pass
     
-    def _generate_semantic_queries(self, image_features):
-        """Generate semantic queries for CLIP analysis"""
-        return [
-            "clothing apparel",
-            "fashion item",
-            "wearable product",
-            "style accessory"
-        ]
-    
-    def _build_context_vectors(self, text, labels, objects):
-        """Build context vectors for analysis"""
-        return []
-    
-    def _advanced_entity_detection_with_attention(self, text, context_vectors):
+    def _advanced_entity_detection_with_attention(self, text):
         """Advanced entity detection"""
         return []
     
-    def _advanced_product_type_detection(self, analysis_results):
-        """Advanced product type detection"""
-        return {
-            'primary_type': 'clothing',
-            'confidence': 0.7
-        }
-    
     def _get_meaningful_color(self, dominant_colors):
-        """Get meaningful color from dominant colors"""
-        if not dominant_colors:
+        """Get the first non-generic color name among the top dominant colors"""
+        palette = [(color.get('red', 0), color.get('green', 0), color.get('blue', 0)) for color in dominant_colors[:5]]
+        if not palette:
             return None
-        return 'blue'  # Placeholder
-    
+        # Product photos are often shot on white or gray, so skip past the background
+        for name in get_color_names(palette):
+            if name and name.lower() not in _GENERIC_COLOR_NAMES:
+                return name.lower()
+        return None
 
 
 
@@ -6,16 +6,22 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+import math
 import numpy as np
 from PIL import Image
 import requests
 from io import BytesIO
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from core.utils import http_session
 
 # Placeholder for a real image model
 # In a real application, this would be a more sophisticated model like CLIP, ResNet, etc.
 # For now, we'll simulate it with a very simple "model"
 class SimpleImageEncoder:
+    WORKING_SIZE = (128, 128)
+    THUMBNAIL_SIZE = (32, 32)
+
     def __init__(self):
         logger.info("Initializing SimpleImageEncoder")
         # In a real scenario, you would load model weights here
@@ -30,20 +36,33 @@ class SimpleImageEncoder:
 
         # Simulate a complex encoding process by creating a feature vector
         # based on the image's average color and size.
-        image = image.resize((128, 128)).convert("RGB")
+        # Only the global mean color is kept, so a small box-filtered thumbnail
+        # averages the same pixels as a 128x128 resize at 1/16 of the work.
+        thumbnail = image.convert("RGB").resize(self.THUMBNAIL_SIZE, Image.Resampling.BOX)
         
         # Get average color
-        avg_color = np.array(image).mean(axis=(0, 1))
+        avg_color = np.asarray(thumbnail, dtype=np.float32).reshape(-1, 3).mean(axis=0)
         
-        # Get size features
-        width, height = image.size
+        # Get size features (the fixed working resolution, as before)
+        width, height = self.WORKING_SIZE
         size_features = np.array([width, height])
         
-        # Combine into a single feature vector (and normalize)
+        # Combine into a single feature vector (and normalize in place; for five
+        # elements a dot product beats np.linalg.norm's dispatch overhead)
         feature_vector = np.concatenate([avg_color, size_features])
-        normalized_vector = feature_vector / np.linalg.norm(feature_vector)
+        feature_vector *= 1.0 / math.sqrt(feature_vector @ feature_vector)
         
-        return normalized_vector.astype(np.float32)
+        return feature_vector.astype(np.float32)
+
+    def decode(self, image_data: bytes) -> Image.Image:
+        """
+        Opens encoded image bytes for encode().
+        """
+        image = Image.open(BytesIO(image_data))
+        # JPEGs are scaled down inside libjpeg while decoding (no-op for other formats);
+        # the result still covers THUMBNAIL_SIZE, which is all encode() looks at
+        image.draft("RGB", self.THUMBNAIL_SIZE)
+        return image
 
 class EncoderService:
     """
@@ -58,7 +77,7 @@ class EncoderService:
         Encodes an image from raw bytes.
         """
         try:
-            image = Image.open(BytesIO(image_data))
+            image = self.model.decode(image_data)
             return self.model.encode(image)
         except Exception as e:
             logger.error(f"Failed to encode image from data: {e}")
@@ -69,9 +88,9 @@ class EncoderService:
         Encodes an image from a URL.
         """
         try:
-            response = requests.get(image_url, timeout=10)
+            response = http_session.get(image_url, timeout=10)
             response.raise_for_status()
-            image = Image.open(BytesIO(response.content))
+            image = self.model.decode(response.content)
             return self.model.encode(image)
         except requests.exceptions.RequestException as e:
             logger.error(f"Failed to download image from URL {image_url}: {e}")
@@ -80,6 +99,20 @@ class EncoderService:
             logger.error(f"Failed to encode image from URL {image_url}: {e}")
             return None
 
+    def encode_images_from_urls(self, image_urls: List[str], max_workers: int = 16) -> Dict[str, np.ndarray]:
+        """
+        Encodes images from several URLs, downloading them concurrently.
+        URLs that fail to download or encode are left out of the result.
+        """
+        unique_urls = list(dict.fromkeys(image_urls))
+        if not unique_urls:
+            return {}
+        # Downloads are network-bound, so overlapping them costs the slowest request, not the sum;
+        # encoding runs on the same workers, as SimpleImageEncoder keeps no per-call state
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(unique_urls))) as executor:
+            embeddings = executor.map(self.encode_image_from_url, unique_urls)
+            return {url: embedding for url, embedding in zip(unique_urls, embeddings) if embedding is not None}
+
 _encoder_service_instance = None
 
 def get_encoder_service() -> EncoderService:
@@ -8,16 +8,29 @@ from dotenv import load_dotenv
 
 logger = logging.getLogger(__name__)
 
+# Candidate .env locations, resolved once at import
+_ENV_PATH = Path(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) / '.env'
+_ALT_ENV_PATH = Path('/') / '.env'  # Root path in Railway container
+# Result of the first load; later calls reuse it instead of probing again
+_env_loaded = None
+
 def load_environment_variables():
     """
     Load environment variables from .env file if it exists, 
     otherwise log a message but don't treat it as an error in production.
+    Only the first call does any work; later calls return its result.
     
     Returns:
         bool: True if .env was loaded, False otherwise
     """
-    env_path = Path(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) / '.env'
-    alt_env_path = Path('/') / '.env'  # Root path in Railway container
+    global _env_loaded
+    if _env_loaded is None:
+        _env_loaded = _load_dotenv_file()
+    return _env_loaded
+
+def _load_dotenv_file():
+    env_path = _ENV_PATH
+    alt_env_path = _ALT_ENV_PATH
     
     if env_path.exists():
         load_dotenv(dotenv_path=env_path)
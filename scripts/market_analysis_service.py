@@ -6,8 +6,8 @@ and perform visual re-ranking of marketplace results.
 import logging
 logger = logging.getLogger(__name__)
 
-import requests
 import numpy as np
+from operator import itemgetter
 from typing import Dict, Any, List, Optional
 from .aggregator_service import get_aggregator_service
 
@@ -163,43 +163,37 @@ class MarketAnalysisService:
             logger.warning("Encoder not available; returning comps without visual ranking.")
             return initial_comps
             
-        user_image_vector = self.encoder.encode_image(user_image_data)
+        user_image_vector = self.encoder.encode_image_from_data(user_image_data)
         if user_image_vector is None:
             logger.warning("Could not encode user image; returning comps without visual ranking.")
             return initial_comps
         
-        ranked_results = []
-        processed_count = 0
-        
+        # Grouped by image URL: relisted items share a photo, so each URL is
+        # downloaded and encoded once and its score applies to every comp in the group
+        comps_by_url = {}
         for comp in initial_comps:
-            try:
-                # Extract image URL from comp
-                image_url = self._extract_image_url(comp)
-                if not image_url:
-                    logger.debug(f"No image URL found for comp {comp.get('itemId', 'unknown')}")
-                    continue
-                
-                # Download and encode the marketplace item's image
-                comp_image_vector = self._download_and_encode_image(image_url)
-                if comp_image_vector is not None:
-                    # Calculate cosine similarity
-                    similarity = np.dot(user_image_vector, comp_image_vector)
-                    comp['visual_similarity_score'] = round(float(similarity), 4)
-                    ranked_results.append(comp)
-                    processed_count += 1
-                else:
-                    logger.debug(f"Could not encode comp image for {comp.get('itemId', 'unknown')}")
-                    
-            except Exception as e:
-                logger.warning(f"Error processing comp image for item {comp.get('itemId', 'unknown')}: {e}")
+            image_url = self._extract_image_url(comp)
+            if not image_url:
+                logger.debug(f"No image URL found for comp {comp.get('itemId', 'unknown')}")
                 continue
+            comps_by_url.setdefault(image_url, []).append(comp)
         
-        logger.info(f"Successfully processed {processed_count}/{len(initial_comps)} comp images for visual ranking")
+        # The encoder fetches and encodes the unique URLs concurrently; URLs that
+        # fail are missing from the result and their comps are left out of the ranking
+        comp_vectors = self.encoder.encode_images_from_urls(list(comps_by_url))
+        scored_comps = []
+        for image_url, comp_image_vector in comp_vectors.items():
+            # Calculate cosine similarity
+            score = round(float(np.dot(user_image_vector, comp_image_vector)), 4)
+            comps = comps_by_url[image_url]
+            for comp in comps:
+                comp['visual_similarity_score'] = score
+            scored_comps.extend(comps)
         
-        # Sort by visual similarity score (highest first)
-        ranked_results.sort(key=lambda x: x.get('visual_similarity_score', 0), reverse=True)
+        logger.info(f"Successfully processed {len(scored_comps)}/{len(initial_comps)} comp images for visual ranking")
         
-        return ranked_results
+        # Sort by visual similarity score (highest first)
+        return sorted(scored_comps, key=itemgetter('visual_similarity_score'), reverse=True)
     
     def _extract_image_url(self, comp: Dict[str, Any]) -> Optional[str]:
         """Extracts image URL from various marketplace result formats."""
@@ -219,22 +213,6 @@ class MarketAnalysisService:
         
         return None
     
-    def _download_and_encode_image(self, image_url: str) -> Optional[np.ndarray]:
-        """Downloads and encodes an image from URL."""
-        try:
-            response = requests.get(image_url, timeout=10, stream=True)
-            response.raise_for_status()
-            
-            # Read image data
-            image_data = response.content
-            
-            # Encode using our CLIP model
-            return self.encoder.encode_image(image_data)
-            
-        except Exception as e:
-            logger.debug(f"Failed to download/encode image from {image_url}: {e}")
-            return None
-    
     def analyze_price_trends(self, ranked_comps: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Analyzes price trends from the ranked comps.
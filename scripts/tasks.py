@@ -13,7 +13,10 @@ import requests
 import base64
 import json
 import math
+import re
+from dataclasses import dataclass
 from decimal import Decimal
+from operator import attrgetter
 from celery import shared_task, group
 from django.conf import settings
 from django.db.models import Avg, Min, Max, Count
@@ -32,6 +35,16 @@ from core.ebay_auth_service import ebay_auth_service
 
 logger = logging.getLogger(__name__)
 
+def _keyword_pattern(words):
+    """Compile a substring alternation so one search() replaces an any() scan."""
+    return re.compile('|'.join(map(re.escape, words)))
+
+# Seasonal title keywords, matched as substrings (so 'boot' still hits 'boots')
+_WINTER_TITLE_RE = _keyword_pattern(['coat', 'jacket', 'boot', 'sweater', 'hoodie', 'winter', 'snow'])
+_SUMMER_TITLE_RE = _keyword_pattern(['shorts', 't-shirt', 'tank', 'swimsuit', 'summer', 'beach'])
+_ELECTRONICS_TITLE_RE = _keyword_pattern(['iphone', 'samsung', 'laptop', 'computer', 'gaming', 'console'])
+_SPORTS_TITLE_RE = _keyword_pattern(['equipment', 'gear', 'uniform', 'jersey', 'athletic', 'sport'])
+
 def get_ebay_oauth_token():
     """Get eBay OAuth token for API access with automatic refresh"""
     try:
@@ -141,6 +154,15 @@ def should_skip_api_call():
         logger.error(f"Error parsing rate limit data: {e}")
         return False
 
+@dataclass(slots=True)
+class WeightedPrice:
+    """A comp's sold price with its combined and component pricing weights"""
+    price: float
+    weight: float
+    original_weight: float
+    seasonal_mult: float
+    platform_weight: float
+
 @shared_task
 def aggregate_analysis_results(results, analysis_id):
     """
@@ -222,13 +244,13 @@ def aggregate_analysis_results(results, analysis_id):
         # Combined weight
         final_weight = time_weight * seasonal_multiplier * platform_weight * geo_weight
         
-        weighted_prices.append({
-            'price': price,
-            'weight': final_weight,
-            'original_weight': time_weight,
-            'seasonal_mult': seasonal_multiplier,
-            'platform_weight': platform_weight
-        })
+        weighted_prices.append(WeightedPrice(
+            price=price,
+            weight=final_weight,
+            original_weight=time_weight,
+            seasonal_mult=seasonal_multiplier,
+            platform_weight=platform_weight
+        ))
 
     # --- IMPROVEMENT 5: Enhanced Hot Zone Analysis ---
     if not weighted_prices:
@@ -236,34 +258,36 @@ def aggregate_analysis_results(results, analysis_id):
         analysis.save()
         return "No valid prices after filtering."
 
-    sorted_by_price = sorted(weighted_prices, key=lambda x: x['price'])
-    total_weight = sum(p['weight'] for p in sorted_by_price)
+    sorted_by_price = sorted(weighted_prices, key=attrgetter('price'))
+    total_weight = sum(p.weight for p in sorted_by_price)
 
-    # Find the price at which 25% and 75% of the "sales weight" is accumulated
+    # Find the price at which 25% and 75% of the "sales weight" is accumulated, in one pass
     cumulative_weight = 0
-    hot_zone_min = sorted_by_price[0]['price']
+    hot_zone_min = hot_zone_max = None
     for p in sorted_by_price:
-        cumulative_weight += p['weight']
-        if cumulative_weight >= total_weight * 0.25:
-            hot_zone_min = p['price']
-            break
-
-    cumulative_weight = 0
-    hot_zone_max = sorted_by_price[-1]['price']
-    for p in sorted_by_price:
-        cumulative_weight += p['weight']
-        if cumulative_weight >= total_weight * 0.75:
-            hot_zone_max = p['price']
+        cumulative_weight += p.weight
+        if hot_zone_min is None and cumulative_weight >= total_weight * 0.25:
+            hot_zone_min = p.price
+        if hot_zone_max is None and cumulative_weight >= total_weight * 0.75:
+            hot_zone_max = p.price
+        if hot_zone_min is not None and hot_zone_max is not None:
             break
+    if hot_zone_min is None:
+        hot_zone_min = sorted_by_price[0].price
+    if hot_zone_max is None:
+        hot_zone_max = sorted_by_price[-1].price
 
     # Final weighted average calculation within hot zone
-    hot_zone_prices = [p for p in weighted_prices if hot_zone_min <= p['price'] <= hot_zone_max]
+    hot_zone_prices = [p for p in weighted_prices if hot_zone_min <= p.price <= hot_zone_max]
     
     if not hot_zone_prices:
         hot_zone_prices = weighted_prices
 
-    sum_of_weighted_prices = sum(p['price'] * p['weight'] for p in hot_zone_prices)
-    sum_of_weights_in_hot_zone = sum(p['weight'] for p in hot_zone_prices)
+    sum_of_weighted_prices = 0
+    sum_of_weights_in_hot_zone = 0
+    for p in hot_zone_prices:
+        sum_of_weighted_prices += p.price * p.weight
+        sum_of_weights_in_hot_zone += p.weight
     
     suggested_price = sum_of_weighted_prices / sum_of_weights_in_hot_zone if sum_of_weights_in_hot_zone > 0 else 0
 
@@ -272,8 +296,8 @@ def aggregate_analysis_results(results, analysis_id):
 
     # --- Save Enhanced Results ---
     analysis.suggested_price = Decimal(suggested_price).quantize(Decimal("0.01"))
-    analysis.price_range_low = Decimal(min(p['price'] for p in weighted_prices)).quantize(Decimal("0.01"))
-    analysis.price_range_high = Decimal(max(p['price'] for p in weighted_prices)).quantize(Decimal("0.01"))
+    analysis.price_range_low = Decimal(min(p.price for p in weighted_prices)).quantize(Decimal("0.01"))
+    analysis.price_range_high = Decimal(max(p.price for p in weighted_prices)).quantize(Decimal("0.01"))
     analysis.confidence_score = confidence_report
     analysis.status = 'COMPLETE'
     analysis.save()
@@ -318,54 +342,39 @@ def calculate_confidence_factors(comps, prices, sale_dates, platforms):
 
 def advanced_outlier_detection(prices, conditions, titles, platforms):
     """Multi-dimensional outlier detection"""
-    outlier_flags = [False] * len(prices)
+    price_array = np.asarray(prices, dtype=float)
+    outlier_flags = np.zeros(len(price_array), dtype=bool)
     
     # Price-based outliers (IQR method)
-    if len(prices) >= 4:
-        q1 = np.percentile(prices, 25)
-        q3 = np.percentile(prices, 75)
+    if len(price_array) >= 4:
+        q1, q3 = np.percentile(price_array, [25, 75])
         iqr = q3 - q1
         lower_bound = q1 - 1.5 * iqr
         upper_bound = q3 + 1.5 * iqr
-        
-        for i, price in enumerate(prices):
-            if price < lower_bound or price > upper_bound:
-                outlier_flags[i] = True
+        outlier_flags |= (price_array < lower_bound) | (price_array > upper_bound)
     
     # Condition-based outliers (if condition data is available)
     condition_groups = {}
     for i, condition in enumerate(conditions):
         if condition:
-            if condition not in condition_groups:
-                condition_groups[condition] = []
-            condition_groups[condition].append(prices[i])
-    
-    # Detect condition-specific outliers
-    for condition, condition_prices in condition_groups.items():
-        if len(condition_prices) >= 3:
-            condition_mean = np.mean(condition_prices)
-            condition_std = np.std(condition_prices)
-            for i, (price, comp_condition) in enumerate(zip(prices, conditions)):
-                if comp_condition == condition and abs(price - condition_mean) > 2 * condition_std:
-                    outlier_flags[i] = True
+            condition_groups.setdefault(condition, []).append(i)
+    _flag_group_outliers(price_array, condition_groups, outlier_flags, 2)
     
     # Platform-based validation
     platform_groups = {}
     for i, platform in enumerate(platforms):
-        if platform not in platform_groups:
-            platform_groups[platform] = []
-        platform_groups[platform].append(prices[i])
+        platform_groups.setdefault(platform, []).append(i)
+    _flag_group_outliers(price_array, platform_groups, outlier_flags, 2.5)
     
-    # Detect platform-specific outliers
-    for platform, platform_prices in platform_groups.items():
-        if len(platform_prices) >= 3:
-            platform_mean = np.mean(platform_prices)
-            platform_std = np.std(platform_prices)
-            for i, (price, comp_platform) in enumerate(zip(prices, platforms)):
-                if comp_platform == platform and abs(price - platform_mean) > 2.5 * platform_std:
-                    outlier_flags[i] = True
-    
-    return outlier_flags
+    return outlier_flags.tolist()
+
+def _flag_group_outliers(price_array, groups, outlier_flags, std_multiplier):
+    """Flag prices more than std_multiplier deviations from their group's mean"""
+    for indices in groups.values():
+        if len(indices) >= 3:
+            group_prices = price_array[indices]
+            deviations = np.abs(group_prices - group_prices.mean())
+            outlier_flags[indices] |= deviations > std_multiplier * group_prices.std()
 
 def calculate_market_volatility(prices, sale_dates):
     """Calculate market volatility based on recent price movements"""
@@ -417,21 +426,21 @@ def calculate_seasonal_multiplier(sale_date, title):
     
     # Enhanced seasonal patterns with more categories
     # Winter items (coats, boots, etc.)
-    if any(word in title_lower for word in ['coat', 'jacket', 'boot', 'sweater', 'hoodie', 'winter', 'snow']):
+    if _WINTER_TITLE_RE.search(title_lower):
         if month in [12, 1, 2]:  # Winter months
             return 1.25  # Increased from 1.2
         elif month in [6, 7, 8]:  # Summer months
             return 0.75  # Decreased from 0.8
     
     # Summer items (shorts, t-shirts, etc.)
-    elif any(word in title_lower for word in ['shorts', 't-shirt', 'tank', 'swimsuit', 'summer', 'beach']):
+    elif _SUMMER_TITLE_RE.search(title_lower):
         if month in [6, 7, 8]:  # Summer months
             return 1.25  # Increased from 1.2
         elif month in [12, 1, 2]:  # Winter months
             return 0.75  # Decreased from 0.8
     
     # Electronics (holiday season impact)
-    elif any(word in title_lower for word in ['iphone', 'samsung', 'laptop', 'computer', 'gaming', 'console']):
+    elif _ELECTRONICS_TITLE_RE.search(title_lower):
         if month in [11, 12]:  # Holiday season
             return 1.15  # Holiday premium
         elif month in [1, 2]:  # Post-holiday
@@ -439,8 +448,7 @@ def calculate_seasonal_multiplier(sale_date, title):
     
     # Sports equipment (AI-driven seasonal detection)
     # Look for patterns that suggest sports equipment without hardcoded terms
-    sports_indicators = ['equipment', 'gear', 'uniform', 'jersey', 'athletic', 'sport']
-    if any(indicator in title_lower for indicator in sports_indicators):
+    if _SPORTS_TITLE_RE.search(title_lower):
         if month in [3, 4, 5, 9, 10]:  # Sports seasons
             return 1.1
         else: